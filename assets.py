@@ -0,0 +1,67 @@
+import pygame
+
+class Assets:
+    """A class to load, convert and share all sprite images."""
+
+    # Image files used by the game, keyed by the name sprites ask for.
+    IMAGE_FILES = {
+        'alien': 'images/ufo.bmp',
+        'star': 'images/star.bmp',
+        'ship': 'images/starship.bmp',
+        'alien_explosion': 'images/alienboom.bmp',
+        'ship_explosion': 'images/boom.bmp',
+    }
+
+    def __init__(self):
+        """Initialize the asset registry. Images are loaded on first use."""
+        self.images = {}
+        # Collision masks, made once per image or solid rect size.
+        self.masks = {}
+
+        # Count cache hits and misses.
+        self.hits = 0
+        self.misses = 0
+
+    def _load(self, path):
+        """Load a single image and convert it to the display pixel format."""
+        image = pygame.image.load(path)
+        # Only convert once a display surface exists to convert against.
+        if not pygame.display.get_surface():
+            return image
+        if image.get_flags() & pygame.SRCALPHA:
+            return image.convert_alpha()
+        return image.convert()
+
+    def get(self, name):
+        """Return the shared surface for an image name."""
+        image = self.images.get(name)
+        if image is not None:
+            self.hits += 1
+            return image
+        # Load images missing from the registry on first use.
+        self.misses += 1
+        image = self._load(self.IMAGE_FILES[name])
+        self.images[name] = image
+        return image
+
+    def mask(self, name):
+        """Return the shared collision mask for an image name."""
+        if name not in self.masks:
+            self.masks[name] = pygame.mask.from_surface(self.get(name))
+        return self.masks[name]
+
+    def solid_mask(self, size):
+        """Return a shared fully set mask for a plain rect of a size."""
+        size = tuple(size)
+        if size not in self.masks:
+            self.masks[size] = pygame.mask.Mask(size, fill=True)
+        return self.masks[size]
+
+    def stats(self):
+        """Return a dictionary of registry usage counters."""
+        return {
+            'images': len(self.images),
+            'masks': len(self.masks),
+            'hits': self.hits,
+            'misses': self.misses,
+        }
@@ -0,0 +1,152 @@
+"""
+Play many headless games in parallel for balance tuning. Each game runs in
+    its own worker process with its own seed, and every game's outcome is
+    written as a line of JSON. For example:
+
+    python batch.py --games 1000 --set alien_speed=0.5,0.75 --output out.jsonl
+"""
+import os
+import json
+import random
+import argparse
+import itertools
+from time import perf_counter
+from concurrent.futures import ProcessPoolExecutor
+
+# Settings that can be tuned, and the type their values are read as.
+TUNABLE = {
+    'alien_speed': float,
+    'fleet_drop_speed': int,
+    'bullet_speed': float,
+    'bullets_allowed': int,
+    'ship_limit': int,
+    'ship_speed': float,
+}
+
+def random_policy(rng, tick):
+    """Pick a random movement and fire some of the time."""
+    actions = []
+    move = rng.choice(('left', 'right', None))
+    if move:
+        actions.append(move)
+    if rng.random() < 0.5:
+        actions.append('fire')
+    return actions
+
+def sweep_policy(rng, tick):
+    """Sweep from side to side, firing constantly."""
+    return ['left' if (tick // 600) % 2 else 'right', 'fire']
+
+POLICIES = {
+    'random': random_policy,
+    'sweep': sweep_policy,
+}
+
+def play_game(job):
+    """Play one game to the end, or to max_ticks, and return its outcome."""
+    # Imported here so each worker sets up its own headless pygame.
+    from spaceinvader import SpaceInvaders
+
+    start = perf_counter()
+    rng = random.Random(job['seed'])
+    ai_game = SpaceInvaders(num_aliens=job['num_aliens'], headless=True,
+        seed=job['seed'])
+    ai_game.apply_settings(job['settings'])
+    policy = POLICIES[job['policy']]
+    decision_ticks = job['decision_ticks']
+
+    ai_game.step(['play'], 0)
+    while ai_game.ticks < job['max_ticks'] and not ai_game.state.waiting:
+        ai_game.step(policy(rng, ai_game.ticks), decision_ticks)
+
+    elapsed = perf_counter() - start
+    return {
+        'seed': job['seed'],
+        'policy': job['policy'],
+        'settings': job['settings'],
+        'ticks': ai_game.ticks,
+        'game_over': ai_game.state.waiting,
+        'ships_left': ai_game.stats.ships_left,
+        'aliens_destroyed': ai_game.stats.aliens_destroyed,
+        'waves_cleared': ai_game.stats.waves_cleared,
+        'seconds': elapsed,
+        'ticks_per_second': ai_game.ticks / elapsed,
+    }
+
+def parse_settings(pairs):
+    """Turn name=value,value arguments into every combination of settings."""
+    choices = {}
+    for pair in pairs:
+        name, _, values = pair.partition('=')
+        if name not in TUNABLE:
+            raise SystemExit(f"Can't tune {name!r}; choose from "
+                             f"{', '.join(TUNABLE)}")
+        choices[name] = [TUNABLE[name](value) for value in values.split(',')]
+    names = list(choices)
+    return [dict(zip(names, values))
+            for values in itertools.product(*choices.values())]
+
+def make_jobs(args):
+    """Build one job per game, spreading games evenly over the settings."""
+    combinations = parse_settings(args.set)
+    return [{
+        'seed': args.seed + number,
+        'policy': args.policy,
+        'settings': combinations[number % len(combinations)],
+        'num_aliens': args.num_aliens,
+        'max_ticks': args.max_ticks,
+        'decision_ticks': args.decision_ticks,
+    } for number in range(args.games)]
+
+def summarize(results):
+    """Print average outcomes for each combination of settings."""
+    groups = {}
+    for result in results:
+        key = json.dumps(result['settings'], sort_keys=True)
+        groups.setdefault(key, []).append(result)
+    for key, group in groups.items():
+        games = len(group)
+        print(f"{key}: {games} games, "
+              f"{sum(r['waves_cleared'] for r in group) / games:.2f} waves, "
+              f"{sum(r['aliens_destroyed'] for r in group) / games:.1f} "
+              f"invaders, {sum(r['ticks'] for r in group) / games:.0f} ticks, "
+              f"{sum(r['game_over'] for r in group) / games:.0%} game over")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--games', type=int, default=100)
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    parser.add_argument('--policy', choices=POLICIES, default='random')
+    parser.add_argument('--seed', type=int, default=0,
+        help='seed of the first game; each game adds one')
+    parser.add_argument('--num-aliens', type=int, default=36)
+    parser.add_argument('--max-ticks', type=int, default=50000)
+    parser.add_argument('--decision-ticks', type=int, default=5,
+        help='ticks between policy decisions')
+    parser.add_argument('--set', action='append', default=[],
+        metavar='NAME=VALUE[,VALUE...]',
+        help='setting values to try; repeat to combine settings')
+    parser.add_argument('--output', default='batch_results.jsonl')
+    args = parser.parse_args()
+
+    jobs = make_jobs(args)
+    start = perf_counter()
+    results = []
+    with ProcessPoolExecutor(args.workers) as executor, \
+            open(args.output, 'w') as file:
+        # Hand out games in chunks to keep the process traffic down.
+        chunksize = max(1, len(jobs) // (args.workers * 4))
+        for result in executor.map(play_game, jobs, chunksize=chunksize):
+            results.append(result)
+            file.write(json.dumps(result) + '\n')
+    elapsed = perf_counter() - start
+
+    summarize(results)
+    total_ticks = sum(result['ticks'] for result in results)
+    print(f"{len(results)} games on {args.workers} workers in "
+          f"{elapsed:.1f} s: {len(results) / elapsed:.1f} games/s, "
+          f"{total_ticks / elapsed:.0f} ticks/s")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,106 @@
+"""
+Compare the fleet collider with brute force pygame collisions, and pixel
+    mask hits with rect-only hits, as the number of invaders and bullets
+    grows. The collider tests every invader's rect for fleets up to
+    FleetCollider.LINEAR_LIMIT and uses its spatial hash for larger ones;
+    the path column shows which. Run from anywhere with
+    python benchmarks/bench_collisions.py
+"""
+import os
+import sys
+import random
+from timeit import repeat
+
+# Run headless against the game modules in the repository root.
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+os.environ['SDL_VIDEODRIVER'] = 'dummy'
+
+import pygame
+from spaceinvader import SpaceInvaders
+from bullet import Bullet
+from collision import FleetCollider
+
+ALIEN_COUNTS = [36, 150, 200, 500, 2000, 5000]
+BULLET_COUNTS = [4, 16, 64]
+
+def best_ms(function, number=50):
+    """Return the best average time of a call over a few runs, in ms."""
+    return min(repeat(function, number=number, repeat=5)) / number * 1000
+
+def make_bullets(ai_game, count, rng):
+    """Place bullets at random across the fleet's area of the screen."""
+    bullets = pygame.sprite.Group()
+    bottom = max(rect.bottom for rect in (a.rect for a in ai_game.aliens))
+    for _ in range(count):
+        bullet = Bullet(ai_game)
+        bullet.rect.x = rng.randrange(ai_game.settings.screen_width)
+        bullet.rect.y = rng.randrange(bottom)
+        bullet.add(bullets)
+    return bullets
+
+def brute_force_hits(ai_game, bullets):
+    """Find bullet hits the way groupcollide did, by index."""
+    collisions = pygame.sprite.groupcollide(bullets, ai_game.aliens,
+        False, False)
+    hits = {}
+    destroyed = set()
+    # Apply the same one-hit-per-invader rule groupcollide's dokill gives.
+    for bullet in bullets.sprites():
+        indices = [alien.index for alien in collisions.get(bullet, [])
+                   if alien.index not in destroyed]
+        if indices:
+            hits[bullet] = indices
+            destroyed.update(indices)
+    return hits
+
+def run():
+    """Time both collision paths and check that they agree."""
+    rng = random.Random(0)
+    print(f"{'aliens':>7} {'bullets':>7} {'brute ms':>9} {'fleet ms':>8} "
+          f"{'ship brute ms':>13} {'ship fleet ms':>13} {'speedup':>7} "
+          f"{'mask ms':>8} {'ship mask ms':>12} {'hits':>5} {'mask hits':>9} "
+          f"{'path':>5}")
+    for num_aliens in ALIEN_COUNTS:
+        ai_game = SpaceInvaders(num_aliens=num_aliens, headless=True)
+        # Move the fleet part of a step so positions need rounding.
+        for _ in range(7):
+            ai_game.fleet.update(ai_game.settings.alien_speed)
+        ai_game.fleet.sync()
+        ship = ai_game.ship
+        masked = FleetCollider(ai_game.fleet, ai_game.assets.mask('alien'))
+        ship_mask = ai_game.assets.mask('ship')
+        bullet_mask = ai_game.assets.solid_mask(
+            (ai_game.settings.bullet_width, ai_game.settings.bullet_height))
+        # A collider that always uses the hash, to check both paths agree.
+        hashed_only = FleetCollider(ai_game.fleet)
+        hashed_only.linear_limit = -1
+        linear = num_aliens <= ai_game.collider.linear_limit
+        for num_bullets in BULLET_COUNTS:
+            bullets = make_bullets(ai_game, num_bullets, rng)
+            sprites = bullets.sprites()
+            rect_hits = ai_game.collider.bullet_hits(sprites)
+            assert brute_force_hits(ai_game, bullets) == rect_hits
+            assert hashed_only.bullet_hits(sprites) == rect_hits
+            # Invaders hit by mask can only ever be a subset of rect hits.
+            mask_hits = masked.bullet_hits(sprites, bullet_mask)
+            assert (set().union(*mask_hits.values()) <=
+                    set().union(*rect_hits.values()))
+
+            brute = best_ms(lambda: brute_force_hits(ai_game, bullets))
+            hashed = best_ms(lambda: ai_game.collider.bullet_hits(sprites))
+            ship_brute = best_ms(
+                lambda: pygame.sprite.spritecollideany(ship, ai_game.aliens))
+            ship_hashed = best_ms(lambda: ai_game.collider.collides(ship.rect))
+            mask = best_ms(lambda: masked.bullet_hits(sprites, bullet_mask))
+            ship_masked = best_ms(lambda: masked.collides(ship.rect, ship_mask))
+            print(f"{len(ai_game.aliens):>7} {num_bullets:>7} {brute:>9.3f} "
+                  f"{hashed:>8.3f} {ship_brute:>13.3f} {ship_hashed:>13.3f} "
+                  f"{brute / hashed:>6.1f}x {mask:>8.3f} {ship_masked:>12.3f} "
+                  f"{sum(map(len, rect_hits.values())):>5} "
+                  f"{sum(map(len, mask_hits.values())):>9} "
+                  f"{'rects' if linear else 'hash':>5}")
+
+if __name__ == '__main__':
+    run()
@@ -0,0 +1,125 @@
+"""
+Measure how many agent steps per second the environments run, alone and
+    batched, with state and pixel observations. Run from anywhere with
+    python benchmarks/bench_env.py
+
+SyncVectorEnv steps its environments one after another, so batching adds
+    convenience rather than steps per second. AsyncVectorEnv plays them in
+    one worker process per CPU, so its steps per second grow with the CPUs
+    there are to run on.
+"""
+import os
+import sys
+import random
+from time import perf_counter
+
+import numpy as np
+import pygame
+
+# Run headless against the game modules in the repository root.
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+os.environ['SDL_VIDEODRIVER'] = 'dummy'
+
+from env import SpaceInvadersEnv, SyncVectorEnv, AsyncVectorEnv
+
+ENV_COUNTS = [1, 8, 32]
+
+# Ways of batching environments to compare.
+VECTOR_ENVS = {
+    'sync': SyncVectorEnv,
+    'async': AsyncVectorEnv,
+}
+
+# Observations to try, as options for the environments.
+OBSERVATIONS = {
+    'state': {'observation': 'state'},
+    'pixels/4': {'observation': 'pixels', 'downsample': 4},
+    'pixels/1': {'observation': 'pixels'},
+}
+
+def check_reset():
+    """Check that a seeded game plays the same way twice."""
+    env = SpaceInvadersEnv()
+    runs = []
+    for _ in range(2):
+        rng = random.Random(0)
+        observation, info = env.reset(seed=0)
+        total = 0
+        for _ in range(500):
+            observation, reward, terminated, truncated, info = env.step(
+                rng.randrange(env.num_actions))
+            total += reward
+        runs.append((total, info, observation.tobytes()))
+    assert runs[0] == runs[1], 'a reset game played differently'
+
+def check_separate_screens():
+    """
+    Check that batched environments given different actions see different
+        pixels, each drawn on a screen no other environment draws over.
+    """
+    vector = SyncVectorEnv(2, observation='pixels')
+    vector.reset(seed=0)
+    for _ in range(60):
+        observations = vector.step([1, 5])[0]
+    assert not np.array_equal(observations[0], observations[1]), \
+        'environments given different actions saw the same pixels'
+    first, second = (env.game.screen for env in vector.envs)
+    assert first is not second, 'environments share a screen'
+    # The first screen still holds what the first environment drew.
+    pixels = pygame.surfarray.array3d(first).transpose(1, 0, 2)
+    assert np.array_equal(pixels, observations[0]), \
+        'another environment drew over the first screen'
+
+def check_workers_agree():
+    """
+    Check that environments played in worker processes, shared out
+        unevenly, play exactly as they do in this process.
+    """
+    synced = SyncVectorEnv(5)
+    workers = AsyncVectorEnv(5, num_workers=2)
+    expected, result = synced.reset(seed=0), workers.reset(seed=0)
+    assert (np.array_equal(expected[0], result[0]) and
+            expected[1] == result[1]), \
+        'worker environments started differently'
+    rng = random.Random(0)
+    for _ in range(300):
+        actions = [rng.randrange(synced.num_actions) for _ in range(5)]
+        expected, result = synced.step(actions), workers.step(actions)
+        assert (all(np.array_equal(*arrays)
+                    for arrays in zip(expected[:4], result[:4])) and
+                expected[4] == result[4]), \
+            'worker environments played differently'
+    workers.close()
+
+def bench(vector_env, num_envs, options, steps):
+    """Return the aggregate steps per second of a batch of environments."""
+    vector = vector_env(num_envs, **options)
+    vector.reset(seed=0)
+    rng = random.Random(0)
+    start = perf_counter()
+    for _ in range(steps):
+        vector.step([rng.randrange(vector.num_actions)
+                     for _ in range(num_envs)])
+    rate = steps * num_envs / (perf_counter() - start)
+    if hasattr(vector, 'close'):
+        vector.close()
+    return rate
+
+def main():
+    check_reset()
+    check_separate_screens()
+    check_workers_agree()
+    print(f'{os.cpu_count()} CPUs')
+    print(f"{'observation':<12} {'batch':<6} " +
+          ' '.join(f'{count:>8} envs' for count in ENV_COUNTS))
+    for name, options in OBSERVATIONS.items():
+        for batch, vector_env in VECTOR_ENVS.items():
+            rates = [bench(vector_env, count, options, max(20, 400 // count))
+                     for count in ENV_COUNTS]
+            print(f"{name:<12} {batch:<6} " +
+                  ' '.join(f'{rate:>10.0f}/s' for rate in rates))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,223 @@
+"""
+Benchmark the game loop across fleet sizes and bullet loads. Run from
+    anywhere with python benchmarks/bench_game.py. Use --output to save the
+    results as JSON and --baseline to compare against a saved run. Fleets
+    of the wrong size, slow respawns or cases that spend their ticks
+    anywhere but playing fail the run.
+"""
+import os
+import sys
+import json
+import argparse
+import tracemalloc
+from time import perf_counter
+
+# Run headless against the game modules in the repository root.
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+os.environ['SDL_VIDEODRIVER'] = 'dummy'
+
+from spaceinvader import SpaceInvaders
+from renderer import DirtyRenderer
+from profiler import FrameProfiler
+from boom import ExplosionSheet
+
+ALIEN_COUNTS = [36, 200, 1000, 5000]
+
+# Bullet loads as (bullets allowed, ticks between shots).
+LOADS = {
+    'light': (4, 30),
+    'heavy': (32, 4),
+}
+
+# Results where bigger is better; every other timing is smaller is better.
+HIGHER_IS_BETTER = {'ticks_per_second', 'full_fps', 'dirty_fps',
+                    'playing_fraction'}
+
+# Timings below this many milliseconds are too small to compare.
+NOISE_MS = 0.01
+
+# Most time a fleet may take to respawn, in milliseconds, as a fixed cost
+# plus a cost per invader.
+RESPAWN_BUDGET_MS = 1.0
+RESPAWN_BUDGET_PER_ALIEN_MS = 0.002
+
+# Least fraction of ticks a case must spend playing, so that it times the
+# game rather than the pause after the ship is hit.
+MIN_PLAYING_FRACTION = 0.95
+
+def scripted_actions(tick, fire_every):
+    """Return the actions for a tick: sweep side to side and fire."""
+    actions = ['left'] if (tick // 300) % 2 else ['right']
+    if tick % fire_every == 0:
+        actions.append('fire')
+    return actions
+
+def play(ai_game, ticks, fire_every, after_tick=None):
+    """Play a number of ticks, starting a new game whenever one ends."""
+    for tick in range(ticks):
+        if ai_game.state.waiting:
+            ai_game.step(['play'], 0)
+        ai_game.step(scripted_actions(tick, fire_every), 1)
+        if after_tick:
+            after_tick()
+
+class BenchGame(SpaceInvaders):
+    """
+    A game that starts each fleet with its bottom row in the top half of
+        the screen. Fleets too big to fit start with their first rows above
+        the top edge, so every case times play rather than the ship being
+        hit by a fleet laid out over it.
+    """
+
+    def _create_fleet(self):
+        """Create the fleet, lifted until its bottom row fits."""
+        xs, ys = self.fleet.layout(self.num_aliens)
+        if len(ys):
+            lift = max(0, ys.max() + self.fleet.height -
+                       self.settings.screen_height // 2)
+            ys = ys - lift
+        self.fleet.build(xs, ys)
+
+def make_game(num_aliens, bullets_allowed):
+    """Build a headless game set up for a bullet load."""
+    ai_game = BenchGame(num_aliens=num_aliens, headless=True, seed=0)
+    ai_game.apply_settings({'bullets_allowed': bullets_allowed})
+    return ai_game
+
+def time_calls(function, number):
+    """Return the average time of a call in milliseconds."""
+    start = perf_counter()
+    for _ in range(number):
+        function()
+    return (perf_counter() - start) / number * 1000
+
+def bench_case(num_aliens, bullets_allowed, fire_every, ticks, frames):
+    """Measure one fleet size and bullet load."""
+    result = {}
+
+    # Setup cost and peak Python memory of building and playing a game.
+    tracemalloc.start()
+    start = perf_counter()
+    ai_game = make_game(num_aliens, bullets_allowed)
+    result['construct_ms'] = (perf_counter() - start) * 1000
+    result['aliens'] = len(ai_game.aliens)
+    play(ai_game, ticks, fire_every)
+    result['peak_memory_kb'] = tracemalloc.get_traced_memory()[1] / 1024
+    tracemalloc.stop()
+    result['create_fleet_ms'] = time_calls(ai_game._create_fleet, 5)
+    result['bake_stars_ms'] = time_calls(
+        lambda: ai_game.starfield.bake(ai_game.screen.get_size()), 5)
+    result['bake_explosions_ms'] = time_calls(
+        lambda: ExplosionSheet(ai_game.assets.get('alien_explosion'),
+            ai_game.settings.explosion_frames), 5)
+
+    # Logic ticks per second, without drawing.
+    ai_game = make_game(num_aliens, bullets_allowed)
+    start = perf_counter()
+    play(ai_game, ticks, fire_every)
+    result['ticks_per_second'] = ticks / (perf_counter() - start)
+
+    # Median time of each phase per tick, and how many ticks were played.
+    ai_game = make_game(num_aliens, bullets_allowed)
+    profiler = FrameProfiler(ai_game, window=ticks)
+    profiler.instrument()
+    playing_ticks = 0
+
+    def after_tick():
+        """End the profiled frame and count it if the game was playing."""
+        nonlocal playing_ticks
+        profiler.end_frame()
+        playing_ticks += ai_game.state.playing
+    play(ai_game, ticks, fire_every, after_tick)
+    for name in profiler.names:
+        result[f'{name}_ms'] = profiler.percentiles(name)[0]
+    result['playing_fraction'] = playing_ticks / ticks
+
+    # Rendered frames per second with a full flip and with dirty rects.
+    play(ai_game, 100, fire_every)
+    result['full_fps'] = 1000 / time_calls(ai_game._update_screen, frames)
+    ai_game.renderer = DirtyRenderer(ai_game)
+    result['dirty_fps'] = 1000 / time_calls(ai_game._update_screen, frames)
+    return result
+
+def check(num_aliens, result):
+    """
+    Return the ways a case breaks the fleet size, playing time and respawn
+        budgets.
+    """
+    failures = []
+    if result['aliens'] != num_aliens:
+        failures.append(f"built {result['aliens']} invaders, "
+                        f"not {num_aliens}")
+    if result['playing_fraction'] < MIN_PLAYING_FRACTION:
+        failures.append(f"only played {result['playing_fraction']:.0%} of "
+                        f"its ticks")
+    budget = RESPAWN_BUDGET_MS + RESPAWN_BUDGET_PER_ALIEN_MS * num_aliens
+    if result['create_fleet_ms'] > budget:
+        failures.append(f"respawn took {result['create_fleet_ms']:.3f} ms, "
+                        f"over the {budget:.3f} ms budget")
+    return failures
+
+def compare(results, baseline, tolerance):
+    """Print changes against a baseline and return the regressions."""
+    regressions = []
+    for case, values in results.items():
+        for name, value in values.items():
+            old = baseline.get(case, {}).get(name)
+            if not old or (name.endswith('_ms') and
+                    max(old, value) < NOISE_MS):
+                continue
+            change = (value - old) / old
+            if name not in HIGHER_IS_BETTER:
+                change = -change
+            if change < -tolerance:
+                regressions.append(f'{case} {name}: {old:.3f} -> {value:.3f}')
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--output', help='write results to a JSON file')
+    parser.add_argument('--baseline', help='compare with a saved JSON file')
+    parser.add_argument('--tolerance', type=float, default=0.15,
+        help='fraction a result may get worse before it is a regression')
+    parser.add_argument('--ticks', type=int, default=2000)
+    parser.add_argument('--frames', type=int, default=100)
+    args = parser.parse_args()
+
+    results = {}
+    failures = []
+    for num_aliens in ALIEN_COUNTS:
+        for load, (bullets_allowed, fire_every) in LOADS.items():
+            case = f'{num_aliens}-{load}'
+            results[case] = bench_case(num_aliens, bullets_allowed,
+                fire_every, args.ticks, args.frames)
+            print(f"{case:>12}: {results[case]['ticks_per_second']:>8.0f} "
+                  f"ticks/s {results[case]['full_fps']:>7.0f} full fps "
+                  f"{results[case]['dirty_fps']:>7.0f} dirty fps "
+                  f"{results[case]['peak_memory_kb']:>8.0f} KB peak")
+            failures.extend(f'{case} {failure}'
+                            for failure in check(num_aliens, results[case]))
+
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump(results, file, indent=2)
+
+    for failure in failures:
+        print(f'FAILED {failure}')
+
+    regressions = []
+    if args.baseline:
+        with open(args.baseline) as file:
+            baseline = json.load(file)
+        regressions = compare(results, baseline, args.tolerance)
+        for regression in regressions:
+            print(f'REGRESSION {regression}')
+        if not regressions:
+            print('No regressions against the baseline.')
+    if failures or regressions:
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,63 @@
+"""
+Compare two ways of showing the game scaled to a larger window: drawing the
+    frame at the screen size and scaling it all every frame, or drawing
+    images pre-scaled once per window scale straight to the window. The
+    viewport times both and uses the faster, and the last column times its
+    choice, including the frames it spends timing the slower way again.
+    Run from anywhere with
+    python benchmarks/bench_scaling.py
+"""
+import os
+import sys
+from timeit import timeit
+
+# Run headless against the game modules in the repository root.
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+os.environ['SDL_VIDEODRIVER'] = 'dummy'
+
+from spaceinvader import SpaceInvaders
+from viewport import Viewport
+
+ALIEN_COUNTS = [36, 100, 200, 400, 1000, 5000]
+WINDOW_SIZES = [(1920, 1080), (2560, 1440)]
+NUMBER = 50
+
+def time_draw(viewport, prescale):
+    """
+    Return the average time to draw a frame always, never or sometimes
+        from pre-scaled images, as prescale is True, False or None.
+    """
+    viewport.prescale = prescale
+    # The first frames scale the images and time both ways.
+    for _ in range(3):
+        viewport.draw()
+    return timeit(viewport.draw, number=NUMBER) / NUMBER * 1000
+
+def run():
+    """Time both ways of scaling a frame for each window and fleet size."""
+    print(f"{'window':>10} {'aliens':>7} {'screen ms':>10} "
+          f"{'scale frame ms':>15} {'pre-scaled ms':>14} {'chosen ms':>10}")
+    for window_size in WINDOW_SIZES:
+        for num_aliens in ALIEN_COUNTS:
+            ai_game = SpaceInvaders(num_aliens=num_aliens, headless=True,
+                seed=0)
+            ai_game.step(['play'], 0)
+            ai_game.step(['fire'], 30)
+            ai_game.fleet.sync()
+            screen_ms = timeit(ai_game._draw_full_screen,
+                number=NUMBER) / NUMBER * 1000
+
+            ai_game.settings.window_size = window_size
+            viewport = Viewport(ai_game)
+            scaled_ms = time_draw(viewport, False)
+            prescaled_ms = time_draw(viewport, True)
+            chosen_ms = time_draw(viewport, None)
+            size = f'{window_size[0]}x{window_size[1]}'
+            print(f"{size:>10} {num_aliens:>7} {screen_ms:>10.2f} "
+                  f"{scaled_ms:>15.2f} {prescaled_ms:>14.2f} "
+                  f"{chosen_ms:>10.2f}")
+
+if __name__ == '__main__':
+    run()
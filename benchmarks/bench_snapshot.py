@@ -0,0 +1,62 @@
+"""
+Time saving and restoring whole-game snapshots across fleet sizes, and
+    check that a restored game, in the same or a new game object, plays on
+    exactly as the original did. Run from anywhere with
+    python benchmarks/bench_snapshot.py
+"""
+import os
+import sys
+from timeit import timeit
+
+# Run headless against the game modules in the repository root.
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+os.environ['SDL_VIDEODRIVER'] = 'dummy'
+
+from spaceinvader import SpaceInvaders
+
+ALIEN_COUNTS = [36, 500, 2000, 5000]
+
+def scripted_actions(tick):
+    """Return the actions for a tick: sweep side to side and fire."""
+    return ['left' if (tick // 300) % 2 else 'right', 'fire']
+
+def play(ai_game, start, ticks):
+    """Play ticks from a tick number and return every tick's outcome."""
+    outcomes = []
+    for tick in range(start, start + ticks):
+        outcomes.append(ai_game.step(scripted_actions(tick), 1))
+    ai_game.fleet.sync()
+    outcomes.append(ai_game.snapshot())
+    return outcomes
+
+def check(num_aliens):
+    """Check that restoring a snapshot replays the same game."""
+    ai_game = SpaceInvaders(num_aliens=num_aliens, headless=True, seed=0)
+    ai_game.step(['play'], 0)
+    play(ai_game, 0, 700)
+    data = ai_game.snapshot()
+    expected = play(ai_game, 700, 1500)
+
+    # Roll back the same game, and branch a new one from the snapshot.
+    ai_game.restore(data)
+    assert play(ai_game, 700, 1500) == expected, 'rollback diverged'
+    branch = SpaceInvaders(num_aliens=num_aliens, headless=True, seed=0)
+    branch.restore(data)
+    assert play(branch, 700, 1500) == expected, 'branch diverged'
+    return ai_game, data
+
+def run():
+    """Time snapshots and check them for each fleet size."""
+    print(f"{'aliens':>7} {'bytes':>8} {'save us':>9} {'restore us':>11}")
+    for num_aliens in ALIEN_COUNTS:
+        ai_game, data = check(num_aliens)
+        number = 200
+        save = timeit(ai_game.snapshot, number=number) / number * 1e6
+        restore = timeit(lambda: ai_game.restore(data),
+            number=number) / number * 1e6
+        print(f"{num_aliens:>7} {len(data):>8} {save:>9.1f} {restore:>11.1f}")
+
+if __name__ == '__main__':
+    run()
@@ -0,0 +1,146 @@
+"""
+Stream a headless game to spectators over localhost, check that they see
+    what the game drew, even after a quick load, and report the cost of
+    publishing and each spectator's bandwidth. One spectator never reads,
+    to show that only it has frames dropped, without slowing the game. Run
+    from anywhere with python benchmarks/bench_spectator.py
+"""
+import os
+import sys
+import socket
+import threading
+import time
+from time import perf_counter
+
+# Run headless against the game modules in the repository root.
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+os.environ['SDL_VIDEODRIVER'] = 'dummy'
+
+from spaceinvader import SpaceInvaders
+from spectator import SpectatorClient
+
+FRAMES = 3000
+CHECKED_FRAMES = 600
+# Frames to quick save and quick load on, going back in time like F9.
+SAVE_FRAME = 100
+LOAD_FRAME = 300
+TICKS_PER_FRAME = 4
+
+def scripted_actions(frame):
+    """Return the actions for a frame: sweep side to side and fire."""
+    return ['left' if (frame // 75) % 2 else 'right', 'fire']
+
+def picture(ai_game):
+    """Return where everything in a game would be drawn."""
+    ai_game.fleet.sync()
+    return {
+        'ticks': ai_game.ticks,
+        'state': ai_game.state.current,
+        'ship': ai_game.ship.rect.topleft,
+        'aliens': sorted(alien.rect.topleft for alien in ai_game.aliens),
+        'bullets': sorted(bullet.rect.topleft for bullet in ai_game.bullets),
+        'explosions': sorted(explosion.rect.topleft
+                             for explosion in ai_game.explosions),
+    }
+
+def wait_for(condition, timeout=5):
+    """Wait until condition() is true or timeout seconds have passed."""
+    end = perf_counter() + timeout
+    while not condition() and perf_counter() < end:
+        time.sleep(0.01)
+
+def run():
+    """Publish a game to spectators and compare what they see."""
+    ai_game = SpaceInvaders(headless=True, seed=0)
+    ai_game.enable_spectators()
+    publisher = ai_game.publisher
+    server = publisher.server
+
+    watchers = [SpectatorClient(SpaceInvaders(num_aliens=0, headless=True),
+                                'localhost', server.port) for _ in range(2)]
+    # A spectator with a tiny receive buffer that never reads.
+    stalled = socket.socket()
+    stalled.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 1024)
+    stalled.connect(('localhost', server.port))
+    wait_for(lambda: len(server.clients) == 3)
+
+    def play_frame(frame):
+        """Play a frame and publish it, returning the publishing time."""
+        if ai_game.state.waiting:
+            ai_game.step(['play'], 0)
+        ai_game.step(scripted_actions(frame), TICKS_PER_FRAME)
+        start = perf_counter()
+        publisher.publish()
+        return perf_counter() - start
+
+    def check_watchers(when):
+        """Wait for every watcher to catch up and see the same game."""
+        def caught_up():
+            for watcher in watchers:
+                watcher.update()
+            return all(watcher.game.ticks == ai_game.ticks
+                       for watcher in watchers)
+        wait_for(caught_up)
+        expected = picture(ai_game)
+        for number, watcher in enumerate(watchers):
+            assert picture(watcher.game) == expected, \
+                f'spectator {number} saw a different game {when}'
+
+    # Check every delta, waiting for the watchers after each frame. A
+    # quick load part way through must reach them too.
+    for frame in range(CHECKED_FRAMES):
+        if frame == SAVE_FRAME:
+            saved = ai_game.snapshot()
+        if frame == LOAD_FRAME:
+            ai_game.restore(saved)
+        play_frame(frame)
+        check_watchers(f'on frame {frame}')
+
+    # Then publish as fast as the game runs, while the watchers apply what
+    # they are sent on their own thread. Yielding each frame gives the
+    # server's thread a turn, as the pause between real frames would.
+    playing = True
+
+    def drain():
+        """Apply messages to the watchers until the fast frames are done."""
+        while playing:
+            for watcher in watchers:
+                watcher.update()
+            time.sleep(0.001)
+    drainer = threading.Thread(target=drain)
+    drainer.start()
+    times = []
+    for frame in range(FRAMES):
+        times.append(play_frame(frame))
+        time.sleep(0)
+    playing = False
+    drainer.join()
+    server.keyframe_requested = True
+    publisher.publish()
+    check_watchers('after the final keyframe')
+
+    print(f"published {FRAMES} frames, {sum(times) / FRAMES * 1e6:.1f} us "
+          f"each on average, {max(times) * 1e6:.0f} us at most")
+    # Only the spectator that never reads should have frames dropped.
+    stalled_port = stalled.getsockname()[1]
+    for client in server.stats():
+        port = client['address'][1]
+        print(f"spectator {port}: "
+              f"{client['messages_sent']} messages, "
+              f"{client['bytes_sent']} bytes, "
+              f"{client['bytes_per_second']:.0f} bytes/s, "
+              f"{client['dropped']} dropped")
+        if port == stalled_port:
+            assert client['dropped'], 'the stalled spectator had no drops'
+        else:
+            assert not client['dropped'], \
+                f'spectator {port} had frames dropped while reading'
+    for watcher in watchers:
+        watcher.close()
+    stalled.close()
+    server.close()
+
+if __name__ == '__main__':
+    run()
@@ -0,0 +1,62 @@
+"""
+Measure how long the game takes to show its first frame, from a fresh
+    interpreter each run, and break the time down by startup phase. Run from
+    anywhere with python benchmarks/bench_startup.py. Runs whose median time
+    to first frame is over --budget milliseconds fail.
+"""
+import os
+import sys
+import json
+import argparse
+import statistics
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Run in a new process so module imports are part of the measurement.
+CHILD = """
+import json
+from time import perf_counter
+start = perf_counter()
+from spaceinvader import SpaceInvaders
+imported = perf_counter()
+ai_game = SpaceInvaders(num_aliens={num_aliens}, headless=True)
+ai_game._update_screen()
+times = {{'import': (imported - start) * 1000}}
+times.update(ai_game.startup_times)
+times['total'] += times['import']
+print(json.dumps(times))
+"""
+
+def measure(num_aliens):
+    """Start the game once in a fresh interpreter and return its timings."""
+    env = dict(os.environ, SDL_VIDEODRIVER='dummy',
+        PYGAME_HIDE_SUPPORT_PROMPT='1')
+    output = subprocess.run(
+        [sys.executable, '-c', CHILD.format(num_aliens=num_aliens)],
+        cwd=ROOT, env=env, check=True, capture_output=True, text=True).stdout
+    return json.loads(output.splitlines()[-1])
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--num-aliens', type=int, default=36)
+    parser.add_argument('--budget', type=float, default=500,
+        help='most milliseconds the median time to first frame may take')
+    args = parser.parse_args()
+
+    runs = [measure(args.num_aliens) for _ in range(args.runs)]
+    print(f"{'phase':<12} {'median ms':>9} {'max ms':>8}")
+    for name in runs[0]:
+        values = [run[name] for run in runs]
+        print(f"{name:<12} {statistics.median(values):>9.2f} "
+              f"{max(values):>8.2f}")
+
+    total = statistics.median(run['total'] for run in runs)
+    if total > args.budget:
+        print(f'FAILED first frame took {total:.1f} ms, over the '
+              f'{args.budget:.0f} ms budget')
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
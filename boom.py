@@ -1,74 +1,125 @@
 import pygame
-from pygame.sprite import Sprite
-
-class Explosion(Sprite):
-    """A class that represents a single explosion"""
+from entity import Entity
+
+class ExplosionSheet:
+    """A class that bakes an explosion image into a sheet of animation frames"""
+
+    def __init__(self, image, frames, start_scale=0.5, end_scale=1.5):
+        """
+        Scale image up from start_scale to end_scale while fading it out,
+            over a number of frames drawn side by side on one surface. Every
+            frame is the same size, with the image centered in it.
+        """
+        width, height = image.get_size()
+        self.size = (round(width * end_scale), round(height * end_scale))
+        self.frame_count = frames
+        sheet = pygame.Surface((self.size[0] * frames, self.size[1]),
+            pygame.SRCALPHA)
+
+        for frame in range(frames):
+            progress = frame / max(frames - 1, 1)
+            scale = start_scale + (end_scale - start_scale) * progress
+            scaled = pygame.transform.smoothscale(image,
+                (round(width * scale), round(height * scale)))
+            cell = pygame.Rect((self.size[0] * frame, 0), self.size)
+            # Adding onto the empty sheet copies pixels and alpha exactly.
+            sheet.blit(scaled, scaled.get_rect(center=cell.center),
+                special_flags=pygame.BLEND_RGBA_ADD)
+            alpha = round(255 * (1 - progress * 0.9))
+            sheet.fill((255, 255, 255, alpha), cell,
+                special_flags=pygame.BLEND_RGBA_MULT)
+
+        if pygame.display.get_surface():
+            sheet = sheet.convert_alpha()
+        self.sheet = sheet
+        self.frames = [sheet.subsurface((self.size[0] * frame, 0), self.size)
+                       for frame in range(frames)]
+
+class ExplosionStore:
+    """A class to share explosion sheets and animate every explosion at once"""
 
     def __init__(self, ai_game):
-        """Initalize the explosion and set its starting position"""
-        super().__init__()
-        self.screen = ai_game.screen
+        """Initialize the store for a game's explosions group."""
+        self.game = ai_game
         self.settings = ai_game.settings
+        self.assets = ai_game.assets
+        self.explosions = ai_game.explosions
+        # Animation sheets, baked the first time each kind explodes.
+        self.sheets = {}
+
+    def sheet(self, name):
+        """Return the shared animation sheet for an explosion image name."""
+        sheet = self.sheets.get(name)
+        if sheet is None:
+            sheet = ExplosionSheet(self.assets.get(name),
+                self.settings.explosion_frames)
+            self.sheets[name] = sheet
+        return sheet
+
+    def clear(self):
+        """Drop baked sheets so they are baked again with new settings."""
+        self.sheets = {}
+
+    def now(self):
+        """Return the game time in milliseconds."""
+        return self.game.time_ms
 
     def update(self):
-        """Decrement explosion time"""
-        self.explosion_time = self.explosion_time - 1
-        if self.explosion_time <= 0:
-            self.kill()
-        self.rect.x = self.x
-
-class AlienExplosion(Explosion):
+        """Show each explosion's frame for its age and remove finished ones."""
+        now = self.now()
+        for explosion in self.explosions.sprites():
+            # An explosion restored from a later time starts from the top.
+            age = max(0.0, now - explosion.start_time)
+            if age >= explosion.lifetime:
+                explosion.kill()
+                continue
+            frames = explosion.frames
+            explosion.image = frames[int(age * len(frames)
+                                         / explosion.lifetime)]
+
+class Explosion(Entity):
     """A class that represents a single explosion"""
 
-    def __init__(self, ai_game, x, y):
-        """Initalize the explosion and set its starting position"""
-        super().__init__(ai_game)
-
-        # Load the explosion image and set its rect attribute.
-        self.image = pygame.image.load('images/alienboom.bmp')
-        self.rect = self.image.get_rect()
+    __slots__ = ('store', 'frames', 'start_time', 'lifetime')
 
-        # Start each new explosion at defined position.
-        self.rect.x = x
-        self.rect.y = y
+    # Explosion image name and the setting holding its lifetime.
+    image_name = None
+    lifetime_setting = None
 
-        # Store explosion's exact horizontal position.
-        self.x = float(self.rect.x)
+    def __init__(self, ai_game):
+        """Initalize the explosion"""
+        super().__init__()
+        self.store = ai_game.explosion_store
+        self.rect = pygame.Rect(0, 0, 0, 0)
 
-        # Store explosion's time
-        self.explosion_time = 40
+    def start(self, x, y):
+        """Place the explosion at x, y coordinates and restart it"""
+        # Take the current frames, in case the sheets were baked again.
+        sheet = self.store.sheet(self.image_name)
+        self.frames = sheet.frames
+        self.image = self.frames[0]
 
-    def update(self):
-        """Decrement explosion time"""
-        self.explosion_time -= 1
-        if self.explosion_time <= 0:
-            self.kill()
-        self.rect.x = self.x
+        # Center the animation on the image placed at x, y.
+        width, height = self.store.assets.get(self.image_name).get_size()
+        self.rect.size = sheet.size
+        self.rect.center = (x + width // 2, y + height // 2)
 
-class ShipExplosion(Explosion):
-    """A class that represents a single ship explosion"""
+        # Store when the explosion started and how long it lasts.
+        self.start_time = self.store.now()
+        self.lifetime = getattr(self.store.settings, self.lifetime_setting)
 
-    def __init__(self, ai_game, x, y):
-        """Initalize the explosion and set its starting position"""
-        super().__init__(ai_game)
+class AlienExplosion(Explosion):
+    """A class that represents a single explosion"""
 
-        # Load the explosion image and set its rect attribute.
-        self.image = pygame.image.load('images/boom.bmp')
-        self.rect = self.image.get_rect()
+    __slots__ = ()
 
-        # Start each new explosion at defined position.
-        self.rect.x = x
-        self.rect.y = y
+    image_name = 'alien_explosion'
+    lifetime_setting = 'alien_explosion_ms'
 
-        # Store explosion's exact horizontal position.
-        self.x = float(self.rect.x)
+class ShipExplosion(Explosion):
+    """A class that represents a single ship explosion"""
 
-        # Store explosion's time
-        self.explosion_time = 40
+    __slots__ = ()
 
-    def update(self):
-        """Decrement explosion time"""
-        self.explosion_time -= 1
-        if self.explosion_time <= 0:
-            self.kill()
-        self.rect.x = self.x
+    image_name = 'ship_explosion'
+    lifetime_setting = 'ship_explosion_ms'
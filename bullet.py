@@ -1,30 +1,40 @@
 import pygame
-from pygame.sprite import Sprite
+from entity import Entity
 
-class Bullet(Sprite):
+class Bullet(Entity):
     """Class to manage bullets fired from the ship"""
+
+    __slots__ = ('color', 'y', 'prev_y')
+
     def __init__(self, ai_game):
-        """Create bullet object at ship's current location"""
+        """Create bullet object, ready to be fired"""
         super().__init__()
-        self.screen = ai_game.screen
-        self.settings = ai_game.settings
-        self.color = self.settings.bullet_color
+        settings = ai_game.settings
+        self.color = settings.bullet_color
+
+        # Create a bullet rect at (0, 0).
+        self.rect = pygame.Rect(0, 0, settings.bullet_width,
+            settings.bullet_height)
 
-        # Create a bullet rect at (0, 0) and set correct position.
-        self.rect = pygame.Rect(0, 0, self.settings.bullet_width,
-            self.settings.bullet_height)
-        self.rect.midtop = ai_game.ship.rect.midtop
+    def fire(self, midtop):
+        """Move bullet to the top middle of the ship, midtop"""
+        self.rect.midtop = midtop
 
         # Store bullets position as a decimal value.
         self.y = float(self.rect.y)
+        self.prev_y = self.y
 
-    def update(self):
-        """Move bullet up the screen"""
+    def update(self, speed):
+        """Move bullet speed pixels up the screen"""
+        self.prev_y = self.y
         # Updates the decimal position of the bullet on screen.
-        self.y -= self.settings.bullet_speed
+        self.y -= speed
         # Update rect position.
         self.rect.y = self.y
+        # Remove bullets that have left the screen.
+        if self.rect.bottom <= 0:
+            self.kill()
 
-    def draw_bullet(self):
+    def draw_bullet(self, screen):
         """Draw bullet on screen"""
-        pygame.draw.rect(self.screen, self.color, self.rect)
+        pygame.draw.rect(screen, self.color, self.rect)
@@ -1,32 +1,51 @@
-import pygame.font
+import pygame
 
 class Button:
     def __init__(self, ai_game, msg):
         """Initialize button attributes"""
         self.screen = ai_game.screen
         self.screen_rect = self.screen.get_rect()
+        # Text is rendered through the game's shared text cache.
+        self.text_cache = ai_game.text_cache
 
         # Set the dimensions and properties of the button.
         self.width, self.height = 200, 50
         self.button_color = (0, 255, 0)
         self.text_color = (255, 255, 255)
-        self.font = pygame.font.SysFont(None, 48)
+        self.font_size = 48
 
         # Build the button's rect object and center it on screen.
         self.rect = pygame.Rect(0, 0, self.width, self.height)
         self.rect.center = self.screen_rect.center
 
-        # Button message should be prepped only once per game.
-        self._prep_msg(msg)
+        # Button message is prepped once the font has loaded, and again
+        # whenever it is drawn at a new scale.
+        self.msg = msg
+        self.msg_image = None
+        self.msg_scale = None
 
-    def _prep_msg(self,msg):
-        """Turn msg into a rendered image and center the test on button"""
-        self.msg_image = self.font.render(msg, True, self.text_color,
-                self.button_color)
-        self.msg_image_rect = self.msg_image.get_rect()
-        self.msg_image_rect.center = self.rect.center
+    def _prep_msg(self, msg, scale=1.0):
+        """Turn msg into a rendered image at a scale, ready to center"""
+        self.msg = msg
+        self.msg_scale = scale
+        self.msg_image = self.text_cache.render(msg,
+            round(self.font_size * scale), self.text_color,
+            self.button_color)
 
-    def draw_button(self):
-        # Draw a blank button to the screen and then draw the message.
-        self.screen.fill(self.button_color, self.rect)
-        self.screen.blit(self.msg_image, self.msg_image_rect)
+    def draw_button(self, surface=None, rect=None, scale=1.0):
+        """
+        Draw the button to the screen, or to surface at rect when the game
+            is shown at another scale.
+        """
+        if surface is None:
+            surface = self.screen
+            rect = self.rect
+        # Only render the message again when the font or scale changes.
+        if self.msg_image is None or scale != self.msg_scale:
+            self._prep_msg(self.msg, scale)
+
+        # Draw a blank button and then draw the message centered on it.
+        surface.fill(self.button_color, rect)
+        if self.msg_image:
+            surface.blit(self.msg_image,
+                self.msg_image.get_rect(center=rect.center))
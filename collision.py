@@ -0,0 +1,124 @@
+import math
+
+import pygame
+
+class FleetCollider:
+    """A class to find invader collisions with a spatial hash of the fleet."""
+
+    # Fleets up to this size skip the hash and test every invader's rect,
+    # which is faster than looking up cells when there are few invaders.
+    LINEAR_LIMIT = 150
+
+    def __init__(self, fleet, alien_mask=None):
+        """
+        Initialize the collider for a fleet. With an invader mask, hits
+            that pass the rect test must also overlap pixel for pixel.
+        """
+        self.fleet = fleet
+        self.alien_mask = alien_mask
+        # One cell per slot in the fleet layout, two invaders wide and high.
+        self.cell_width = 2 * fleet.width
+        self.cell_height = 2 * fleet.height
+
+        # Cells map to the invader indices that overlap them.
+        self.cells = {}
+        self.generation = None
+        self.linear_limit = self.LINEAR_LIMIT
+
+    def _refresh(self):
+        """Rebuild the cells whenever the fleet has been rebuilt."""
+        fleet = self.fleet
+        if self.generation == fleet.generation:
+            return
+        self.generation = fleet.generation
+        self.cells = {}
+        # The fleet moves as one, so cells are kept in fleet coordinates
+        # and only need building once per fleet.
+        xs = fleet.base_x.tolist()
+        ys = fleet.base_y.tolist()
+        self.base_x, self.base_y = xs, ys
+        # Invader rects in fleet coordinates, for testing every invader.
+        self.rects = [pygame.Rect(x, y, fleet.width, fleet.height)
+                      for x, y in zip(xs, ys)]
+        for index, (x, y) in enumerate(zip(xs, ys)):
+            for cell in self._cells_for(x, y, x + fleet.width,
+                    y + fleet.height):
+                self.cells.setdefault(cell, []).append(index)
+
+    def _cells_for(self, left, top, right, bottom):
+        """Return every cell overlapped by an area in fleet coordinates."""
+        first_col = math.floor(left / self.cell_width)
+        last_col = math.floor(right / self.cell_width)
+        first_row = math.floor(top / self.cell_height)
+        last_row = math.floor(bottom / self.cell_height)
+        return [(col, row) for col in range(first_col, last_col + 1)
+                for row in range(first_row, last_row + 1)]
+
+    def _candidates(self, left, top, right, bottom):
+        """Return indices of invaders that may overlap a fleet area."""
+        if len(self.rects) <= self.linear_limit:
+            # Whole pixels around the area, a pixel more for the rects' own
+            # rounding, tested against every invader at once.
+            x = math.floor(left) - 1
+            y = math.floor(top) - 1
+            area = pygame.Rect(x, y, math.ceil(right) + 1 - x,
+                math.ceil(bottom) + 1 - y)
+            return area.collidelistall(self.rects)
+        found = set()
+        for cell in self._cells_for(left, top, right, bottom):
+            found.update(self.cells.get(cell, ()))
+        return sorted(found)
+
+    def hits(self, rect, skip=(), mask=None):
+        """
+        Return indices of live invaders whose rects overlap a rect, and
+            whose pixels overlap mask when masks are in use.
+        """
+        self._refresh()
+        fleet = self.fleet
+        alive = fleet.alive
+        width, height = fleet.width, fleet.height
+        # Bounds in fleet coordinates, a pixel wider to allow for rounding,
+        # for a quick test before rounding.
+        left = rect.left - fleet.offset_x - 1
+        right = rect.right - fleet.offset_x + 1
+        top = rect.top - fleet.offset_y - 1
+        bottom = rect.bottom - fleet.offset_y + 1
+        candidates = self._candidates(left, top, right, bottom)
+        base_x, base_y = self.base_x, self.base_y
+        alien_mask = self.alien_mask if mask else None
+        hits = []
+        for index in candidates:
+            if (base_x[index] >= right or base_x[index] + width <= left or
+                    base_y[index] >= bottom or base_y[index] + height <= top):
+                continue
+            if not alive.item(index) or index in skip:
+                continue
+            x, y = fleet.position(index)
+            if not (x < rect.right and x + width > rect.left and
+                    y < rect.bottom and y + height > rect.top):
+                continue
+            # Only check pixels once the rects are known to overlap.
+            if alien_mask and not mask.overlap(
+                    alien_mask, (x - rect.x, y - rect.y)):
+                continue
+            hits.append(index)
+        return hits
+
+    def collides(self, rect, mask=None):
+        """Return True if any live invader overlaps a rect and mask."""
+        return bool(self.hits(rect, mask=mask))
+
+    def bullet_hits(self, bullets, mask=None):
+        """
+        Return a dictionary of each bullet that hit to the invader indices
+            it hit. Like groupcollide, an invader is only hit once.
+        """
+        collisions = {}
+        destroyed = set()
+        for bullet in bullets:
+            hits = self.hits(bullet.rect, destroyed, mask)
+            if hits:
+                collisions[bullet] = hits
+                destroyed.update(hits)
+        return collisions
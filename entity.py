@@ -0,0 +1,72 @@
+class Entity:
+    """
+    A lightweight sprite for things the game makes many of. pygame's Sprite
+        gives every instance a __dict__, so entities use __slots__ and keep
+        only their own state, referring to shared images and settings.
+        Sprite groups accept them like any other sprite.
+    """
+
+    __slots__ = ('image', 'rect', '_groups')
+
+    def __init__(self):
+        """Start the entity outside every group."""
+        # Entities are rarely in more than one group, so a tuple is kept
+        # rather than a set; the empty tuple costs nothing per entity.
+        self._groups = ()
+
+    def add(self, *groups):
+        """Add the entity to groups it is not already in."""
+        for group in groups:
+            if group not in self._groups:
+                group.add_internal(self)
+                self._groups += (group,)
+
+    def remove(self, *groups):
+        """Remove the entity from groups it is in."""
+        for group in groups:
+            if group in self._groups:
+                group.remove_internal(self)
+                self.remove_internal(group)
+
+    def add_internal(self, group):
+        """Note that a group has added the entity."""
+        if group not in self._groups:
+            self._groups += (group,)
+
+    def remove_internal(self, group):
+        """Note that a group has removed the entity."""
+        groups = self._groups
+        if len(groups) == 1 and groups[0] is group:
+            self._groups = ()
+        else:
+            self._groups = tuple(member for member in groups
+                                 if member is not group)
+
+    def update(self, *args):
+        """Do nothing by default when a group is updated."""
+
+    def kill(self):
+        """Remove the entity from every group."""
+        for group in self._groups:
+            group.remove_internal(self)
+        self._groups = ()
+
+    def alive(self):
+        """Return True if the entity is in any group."""
+        return bool(self._groups)
+
+    def groups(self):
+        """Return a list of the groups the entity is in."""
+        return list(self._groups)
+
+def add_all(group, entities):
+    """Add many entities to a group, quickly for entities in no group."""
+    add = group.add_internal
+    # Entities joining only this group can share one groups tuple.
+    member = (group,)
+    for entity in entities:
+        if entity._groups:
+            entity.add(group)
+        else:
+            add(entity)
+            entity._groups = member
@@ -0,0 +1,358 @@
+"""
+Environments for training and evaluating agents on the game, in the style
+    of Gym: reset(seed) starts a game and step(action) plays it. For example:
+
+    env = SpaceInvadersEnv(observation='pixels', downsample=4)
+    observation, info = env.reset(seed=0)
+    observation, reward, terminated, truncated, info = env.step(3)
+
+Observations are written into arrays that are reused between steps, so
+    copy them to keep them.
+"""
+import os
+import multiprocessing
+from multiprocessing import shared_memory
+
+import numpy as np
+import pygame
+
+from spaceinvader import SpaceInvaders
+from gamestate import GameState
+from starfield import Starfield
+
+# Actions an agent can take, by action number.
+ACTIONS = [
+    (),
+    ('left',),
+    ('right',),
+    ('fire',),
+    ('left', 'fire'),
+    ('right', 'fire'),
+]
+
+class SpaceInvadersEnv:
+    """A class to play a headless game one agent action at a time."""
+
+    def __init__(self, num_aliens=36, observation='state', downsample=1,
+            frame_skip=4, max_ticks=50000, settings=None):
+        """
+        Initialize the environment. observation is 'state' for a vector of
+            positions or 'pixels' for the screen, keeping every downsample'th
+            pixel. Each step holds the action for frame_skip ticks, and a
+            game is cut short after max_ticks ticks.
+        """
+        if observation not in ('state', 'pixels'):
+            raise ValueError(f"Unknown observation {observation!r}")
+        self.game = SpaceInvaders(num_aliens=num_aliens, headless=True)
+        if settings:
+            self.game.apply_settings(settings)
+        self.observation_type = observation
+        self.downsample = downsample
+        self.frame_skip = frame_skip
+        self.max_ticks = max_ticks
+        self.num_actions = len(ACTIONS)
+        self.seed = None
+
+        # Number of bullet slots in the state vector.
+        self.max_bullets = self.game.settings.bullets_allowed
+        if observation == 'state':
+            # Ship x and ships left, each invader's x, y and alive flag, and
+            # each bullet's x and y.
+            self.observation_shape = (2 + 3 * num_aliens +
+                                      2 * self.max_bullets,)
+            self.observation_dtype = np.float32
+        else:
+            width, height = self.game.screen.get_size()
+            self.observation_shape = (-(-height // downsample),
+                                      -(-width // downsample), 3)
+            self.observation_dtype = np.uint8
+        self.observation = np.zeros(self.observation_shape,
+            self.observation_dtype)
+
+        self.aliens_destroyed = 0
+
+    def reset(self, seed=None, out=None):
+        """Start a new game and return its first observation and info."""
+        game = self.game
+        # Only the starfield is random, and it only shows in pixels.
+        if (seed is not None and seed != self.seed and
+                self.observation_type == 'pixels'):
+            game.starfield = Starfield(game, seed)
+        self.seed = seed
+
+        game.explosions.empty()
+        game.fleet.direction = 1
+        game.ticks = 0
+        game.time_ms = 0.0
+        game._start_game()
+        self.aliens_destroyed = 0
+        return self._observe(out), self._info()
+
+    def step(self, action, out=None):
+        """
+        Play an action number for frame_skip ticks. Return the observation,
+            the reward of one per invader destroyed, whether the game is
+            over, whether it was cut short and an info dictionary.
+        """
+        game = self.game
+        game.step(ACTIONS[action], self.frame_skip)
+        reward = game.stats.aliens_destroyed - self.aliens_destroyed
+        self.aliens_destroyed = game.stats.aliens_destroyed
+        terminated = game.state.current == GameState.GAME_OVER
+        truncated = not terminated and game.ticks >= self.max_ticks
+        return self._observe(out), reward, terminated, truncated, self._info()
+
+    def _info(self):
+        """Return details of the game that are not in the observation."""
+        game = self.game
+        return {
+            'ticks': game.ticks,
+            'state': game.state.current,
+            'ships_left': game.stats.ships_left,
+            'aliens_destroyed': game.stats.aliens_destroyed,
+            'waves_cleared': game.stats.waves_cleared,
+        }
+
+    def _observe(self, out=None):
+        """Write the current observation into out, or the shared array."""
+        if out is None:
+            out = self.observation
+        if self.observation_type == 'state':
+            self._observe_state(out)
+        else:
+            self._observe_pixels(out)
+        return out
+
+    def _observe_state(self, out):
+        """
+        Write the state vector, with positions scaled to the screen size.
+            Empty bullet slots are -1.
+        """
+        game = self.game
+        fleet = game.fleet
+        width = game.settings.screen_width
+        height = game.settings.screen_height
+        count = len(fleet.x)
+
+        out[0] = game.ship.x / width
+        out[1] = game.stats.ships_left
+        start = 2
+        np.divide(fleet.x, width, out=out[start:start + count])
+        start += count
+        np.divide(fleet.y, height, out=out[start:start + count])
+        start += count
+        out[start:start + count] = fleet.alive
+        start += count
+
+        bullets = out[start:].reshape(2, self.max_bullets)
+        bullets.fill(-1)
+        slot = 0
+        for bullet in game.bullet_pool.sprites:
+            if bullet.alive() and slot < self.max_bullets:
+                bullets[0, slot] = bullet.rect.x / width
+                bullets[1, slot] = bullet.y / height
+                slot += 1
+
+    def _observe_pixels(self, out):
+        """Draw the screen and copy every downsample'th pixel into out."""
+        game = self.game
+        game._update_screen()
+        # pixels3d views the screen in place. The view locks the screen, so
+        # only the kept pixels are copied out before it is released.
+        step = self.downsample
+        pixels = pygame.surfarray.pixels3d(game.screen)[::step, ::step]
+        rows = pixels.transpose(1, 0, 2)
+        # Copying a channel at a time is several times faster than copying
+        # all three, whose bytes run backwards in the screen's pixels.
+        for channel in range(3):
+            np.copyto(out[..., channel], rows[..., channel])
+        del pixels, rows
+
+class SyncVectorEnv:
+    """
+    A class to step several environments together in lockstep, one after
+        another in this process. It saves batching observations by hand but
+        plays no faster than the environments would alone. AsyncVectorEnv
+        plays them in worker processes for more steps per second.
+    """
+
+    def __init__(self, num_envs, **env_options):
+        """
+        Make num_envs environments with the same options. Observations,
+            rewards and flags for all of them are kept in shared arrays.
+        """
+        self.envs = [SpaceInvadersEnv(**env_options)
+                     for _ in range(num_envs)]
+        self.num_envs = num_envs
+        first = self.envs[0]
+        self.num_actions = first.num_actions
+        self.observations = np.zeros((num_envs,) + first.observation_shape,
+            first.observation_dtype)
+        self.rewards = np.zeros(num_envs, dtype=np.float32)
+        self.terminated = np.zeros(num_envs, dtype=bool)
+        self.truncated = np.zeros(num_envs, dtype=bool)
+
+    def reset(self, seed=None):
+        """
+        Start a new game in every environment, seeded seed, seed + 1 and so
+            on, and return the observations and infos.
+        """
+        infos = []
+        for number, env in enumerate(self.envs):
+            env_seed = None if seed is None else seed + number
+            infos.append(env.reset(env_seed, self.observations[number])[1])
+        return self.observations, infos
+
+    def step(self, actions):
+        """
+        Play one action per environment. A finished game starts again
+            straight away; its last info is kept under 'final_info'.
+        """
+        infos = []
+        for number, (env, action) in enumerate(zip(self.envs, actions)):
+            out = self.observations[number]
+            _, reward, terminated, truncated, info = env.step(action, out)
+            if terminated or truncated:
+                info = dict(env.reset(None, out)[1], final_info=info)
+            self.rewards[number] = reward
+            self.terminated[number] = terminated
+            self.truncated[number] = truncated
+            infos.append(info)
+        return (self.observations, self.rewards, self.terminated,
+                self.truncated, infos)
+
+def _run_worker(pipe, num_envs, env_options):
+    """Play a share of an AsyncVectorEnv's environments until closed."""
+    envs = [SpaceInvadersEnv(**env_options) for _ in range(num_envs)]
+    first = envs[0]
+    pipe.send((first.observation_shape, first.observation_dtype,
+               first.num_actions))
+
+    # Write observations straight into this worker's rows of the shared
+    # array.
+    name, total, start = pipe.recv()
+    memory = shared_memory.SharedMemory(name)
+    observations = np.ndarray((total,) + first.observation_shape,
+        first.observation_dtype, memory.buf)[start:start + num_envs]
+    try:
+        while True:
+            command, values = pipe.recv()
+            if command == 'reset':
+                pipe.send([env.reset(seed, out)[1] for env, seed, out in
+                           zip(envs, values, observations)])
+            elif command == 'step':
+                results = []
+                for env, action, out in zip(envs, values, observations):
+                    _, reward, terminated, truncated, info = env.step(action,
+                        out)
+                    if terminated or truncated:
+                        info = dict(env.reset(None, out)[1], final_info=info)
+                    results.append((reward, terminated, truncated, info))
+                pipe.send(results)
+            else:
+                break
+    finally:
+        del observations
+        memory.close()
+
+class AsyncVectorEnv:
+    """
+    A class to step several environments together in lockstep, shared out
+        between worker processes that play them at the same time. Workers
+        write observations into one shared memory array, so only actions,
+        rewards and infos are sent between processes. Scripts using it
+        need an if __name__ == '__main__' guard, since workers are started
+        fresh and import the script again.
+    """
+
+    def __init__(self, num_envs, num_workers=None, **env_options):
+        """
+        Make num_envs environments with the same options, shared out
+            between num_workers processes, one per CPU by default.
+        """
+        num_workers = min(num_envs, num_workers or os.cpu_count() or 1)
+        self.num_envs = num_envs
+        # Workers are spawned rather than forked, so none of them inherits
+        # this process's pygame and display state.
+        context = multiprocessing.get_context('spawn')
+        self.pipes = []
+        self.workers = []
+        self.counts = [num_envs // num_workers + (number < num_envs %
+                       num_workers) for number in range(num_workers)]
+        for count in self.counts:
+            pipe, worker_pipe = context.Pipe()
+            worker = context.Process(target=_run_worker,
+                args=(worker_pipe, count, env_options), daemon=True)
+            worker.start()
+            worker_pipe.close()
+            self.pipes.append(pipe)
+            self.workers.append(worker)
+
+        shape, dtype, self.num_actions = [pipe.recv()
+                                          for pipe in self.pipes][0]
+        size = num_envs * int(np.prod(shape)) * np.dtype(dtype).itemsize
+        self.memory = shared_memory.SharedMemory(create=True,
+            size=max(size, 1))
+        self.observations = np.ndarray((num_envs,) + shape, dtype,
+            self.memory.buf)
+        start = 0
+        for pipe, count in zip(self.pipes, self.counts):
+            pipe.send((self.memory.name, num_envs, start))
+            start += count
+
+        self.rewards = np.zeros(num_envs, dtype=np.float32)
+        self.terminated = np.zeros(num_envs, dtype=bool)
+        self.truncated = np.zeros(num_envs, dtype=bool)
+
+    def _split(self, values):
+        """Return values divided into each worker's share."""
+        shares = []
+        start = 0
+        for count in self.counts:
+            shares.append(values[start:start + count])
+            start += count
+        return shares
+
+    def reset(self, seed=None):
+        """
+        Start a new game in every environment, seeded seed, seed + 1 and so
+            on, and return the observations and infos.
+        """
+        seeds = [None if seed is None else seed + number
+                 for number in range(self.num_envs)]
+        for pipe, share in zip(self.pipes, self._split(seeds)):
+            pipe.send(('reset', share))
+        infos = []
+        for pipe in self.pipes:
+            infos.extend(pipe.recv())
+        return self.observations, infos
+
+    def step(self, actions):
+        """
+        Play one action per environment, every worker at once. A finished
+            game starts again straight away; its last info is kept under
+            'final_info'.
+        """
+        for pipe, share in zip(self.pipes, self._split(list(actions))):
+            pipe.send(('step', share))
+        infos = []
+        number = 0
+        for pipe in self.pipes:
+            for reward, terminated, truncated, info in pipe.recv():
+                self.rewards[number] = reward
+                self.terminated[number] = terminated
+                self.truncated[number] = truncated
+                infos.append(info)
+                number += 1
+        return (self.observations, self.rewards, self.terminated,
+                self.truncated, infos)
+
+    def close(self):
+        """Stop the workers and free the shared observations."""
+        for pipe in self.pipes:
+            pipe.send(('close', None))
+        for worker in self.workers:
+            worker.join()
+        self.observations = None
+        self.memory.close()
+        self.memory.unlink()
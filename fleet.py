@@ -0,0 +1,150 @@
+import math
+
+import numpy as np
+
+from invader import Alien
+from entity import add_all
+
+def to_pixels(values):
+    """Round positions to whole pixels the same way pygame.Rect does."""
+    return np.copysign(np.floor(np.abs(values) + 0.5), values)
+
+def to_pixel(value):
+    """Round a single position to a whole pixel like pygame.Rect does."""
+    return int(math.copysign(math.floor(abs(value) + 0.5), value))
+
+class Fleet:
+    """A class to move the whole invader fleet with array operations."""
+
+    # Fleet layouts already worked out, keyed by screen size, fleet size
+    # and invader size.
+    layouts = {}
+
+    def __init__(self, ai_game):
+        """Initialize an empty fleet."""
+        self.game = ai_game
+        self.settings = ai_game.settings
+        self.screen_rect = ai_game.screen.get_rect()
+        self.aliens = ai_game.aliens
+
+        # Invader size, shared by every invader in the fleet.
+        self.width, self.height = ai_game.assets.get('alien').get_size()
+
+        # Every invader sprite made so far, reused by later fleets.
+        self.all_sprites = []
+
+        # Direction the fleet moves in: 1 is right, -1 is left.
+        self.direction = 1
+
+        # Count of fleets built, so others can tell when the layout changes.
+        self.generation = 0
+        self.build([], [])
+
+    def layout(self, num_aliens):
+        """Return the x and y positions of a fleet of num_aliens invaders."""
+        screen_size = (self.settings.screen_width, self.settings.screen_height)
+        key = (screen_size, num_aliens, (self.width, self.height))
+        if key not in self.layouts:
+            # Space between Invaders is equal to one Invader width, so
+            # find the number of invaders per row.
+            space_available_x = screen_size[0] - (2 * self.width)
+            alien_amount_x = max(1, space_available_x // (2 * self.width))
+            # Fill rows left to right with exactly num_aliens invaders.
+            numbers = np.arange(num_aliens)
+            alien_number = numbers % alien_amount_x
+            row_number = numbers // alien_amount_x
+            xs = self.width + 2 * self.width * alien_number
+            ys = self.height + 2 * self.height * row_number
+            self.layouts[key] = (xs, ys)
+        return self.layouts[key]
+
+    def prebuild(self, num_aliens, chunk=200):
+        """
+        Get a fleet of num_aliens ready a chunk of sprites at a time, so
+            a later build is cheap. Return True once it is ready.
+        """
+        self.layout(num_aliens)
+        missing = num_aliens - len(self.all_sprites)
+        for _ in range(min(missing, chunk)):
+            self.all_sprites.append(
+                Alien(self.game, self, len(self.all_sprites)))
+        return missing <= chunk
+
+    def build(self, xs, ys):
+        """Replace the fleet with invaders at the given positions."""
+        self.aliens.empty()
+        self.x = np.array(xs, dtype=float)
+        self.prev_x = self.x.copy()
+        self.y = np.array(ys, dtype=float)
+        self.alive = np.ones(len(self.x), dtype=bool)
+        # Positions as built, before the fleet moves.
+        self.base_x = self.x.copy()
+        self.base_y = self.y.copy()
+
+        # Distance the whole fleet has moved since it was built.
+        self.offset_x = 0.0
+        self.offset_y = 0.0
+        self.generation += 1
+
+        # Sprites are kept only to draw the invaders.
+        while len(self.all_sprites) < len(self.x):
+            self.all_sprites.append(
+                Alien(self.game, self, len(self.all_sprites)))
+        self.sprites = self.all_sprites[:len(self.x)]
+        add_all(self.aliens, self.sprites)
+        self.stale = True
+        self.sync()
+
+    def kill(self, index):
+        """Mark a single invader as destroyed."""
+        self.alive[index] = False
+
+    def at_edge(self):
+        """Return True if any live invader is at the edge of the screen."""
+        x = to_pixels(self.x[self.alive])
+        return bool(np.any((x + self.width >= self.screen_rect.right) |
+                    (x <= 0)))
+
+    def drop(self, distance):
+        """Move the entire fleet down the screen."""
+        self.y += distance
+        self.offset_y += distance
+        self.stale = True
+
+    def update(self, speed):
+        """Move every invader speed pixels to the left or right."""
+        self.prev_x[:] = self.x
+        step = speed * self.direction
+        self.x += step
+        self.offset_x += step
+        self.stale = True
+
+    def reached_bottom(self):
+        """Return True if any live invader has reached the screen bottom."""
+        bottom = self.y[self.alive] + self.height
+        return bool(np.any(bottom >= self.screen_rect.bottom))
+
+    def position(self, index):
+        """Return the on-screen top left corner of a single invader."""
+        return to_pixel(self.x.item(index)), int(self.y.item(index))
+
+    def sync(self, alpha=1.0):
+        """
+        Copy positions into the invader rects. An alpha below 1 places
+            them between their previous and current positions.
+        """
+        if alpha < 1.0:
+            x = self.x - (self.x - self.prev_x) * (1 - alpha)
+            self.stale = True
+        elif self.stale:
+            x = self.x
+            self.stale = False
+        else:
+            return
+        xs = to_pixels(x).astype(int).tolist()
+        ys = self.y.astype(int).tolist()
+        sprites = self.sprites
+        for index in np.flatnonzero(self.alive).tolist():
+            rect = sprites[index].rect
+            rect.x = xs[index]
+            rect.y = ys[index]
@@ -0,0 +1,49 @@
+class GameState:
+    """A class to track which state the game is in and time transitions."""
+
+    # Waiting for the player to press Play.
+    ATTRACT = 'attract'
+    # The ship and fleet are moving.
+    PLAYING = 'playing'
+    # The ship was hit and the next fleet is being readied.
+    RESPAWNING = 'respawning'
+    # The fleet was destroyed and the next wave is being readied.
+    WAVE_TRANSITION = 'wave_transition'
+    # The last ship was lost.
+    GAME_OVER = 'game_over'
+
+    # States that end by themselves after a number of ticks.
+    TIMED = (RESPAWNING, WAVE_TRANSITION, GAME_OVER)
+
+    def __init__(self):
+        """Start the game in the attract state."""
+        self.current = self.ATTRACT
+        # Ticks left in a timed state, 0 for a state that lasts until changed.
+        self.ticks_left = 0
+
+    def change(self, state, ticks=0):
+        """
+        Move to a new state, lasting ticks game ticks if given. A timed
+            state given no ticks ends on the next tick.
+        """
+        self.current = state
+        if state in self.TIMED:
+            ticks = max(ticks, 1)
+        self.ticks_left = ticks
+
+    def tick(self):
+        """Count down a timed state. Return True on the tick it runs out."""
+        if self.ticks_left <= 0:
+            return False
+        self.ticks_left -= 1
+        return self.ticks_left == 0
+
+    @property
+    def playing(self):
+        """Return True while the ship and fleet are in play."""
+        return self.current == self.PLAYING
+
+    @property
+    def waiting(self):
+        """Return True while the game is waiting for the player to press Play."""
+        return self.current in (self.ATTRACT, self.GAME_OVER)
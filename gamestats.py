@@ -7,9 +7,9 @@ class GameStats:
         """Initialize game statistics."""
         self.settings = ai_game.settings
         self.reset_stats()
-        # Start the game in an inactive state.
-        self.game_active = False
 
     def reset_stats(self):
         """Initialize statistics which change in-game"""
         self.ships_left = self.settings.ship_limit
+        self.aliens_destroyed = 0
+        self.waves_cleared = 0
@@ -0,0 +1,111 @@
+"""
+Estimate how much memory a game instance holds, by entity type and by
+    image surface, to see how many games fit on one host.
+"""
+import sys
+
+def object_bytes(obj):
+    """Return the size of an object plus its attribute dictionary, if any."""
+    size = sys.getsizeof(obj)
+    attributes = getattr(obj, '__dict__', None)
+    if attributes is not None:
+        size += sys.getsizeof(attributes)
+    return size
+
+def entity_bytes(entity):
+    """Return the bytes an entity owns: itself, its rect and its groups."""
+    size = object_bytes(entity) + sys.getsizeof(entity.rect)
+    groups = getattr(entity, '_groups', None)
+    # The empty tuple is shared, so only count group tuples in use.
+    if groups:
+        size += sys.getsizeof(groups)
+    return size
+
+def surface_owner(surface):
+    """Return the surface that owns a surface's pixels."""
+    while surface.get_parent() is not None:
+        surface = surface.get_parent()
+    return surface
+
+def surface_bytes(surface):
+    """Return the bytes of pixel data held by a surface."""
+    return surface.get_pitch() * surface.get_height()
+
+def entity_report(entities):
+    """Return the count and bytes of a list of entities."""
+    sizes = [entity_bytes(entity) for entity in entities]
+    total = sum(sizes)
+    return {
+        'count': len(sizes),
+        'bytes_each': total / len(sizes) if sizes else 0,
+        'bytes': total,
+        'slotted': bool(entities) and not hasattr(entities[0], '__dict__'),
+    }
+
+def memory_report(ai_game):
+    """
+    Return a dictionary of the memory a game holds: bytes per entity type,
+        fleet array bytes, and image surfaces by who refers to them, counting
+        each surface's pixels once however many things share it.
+    """
+    fleet = ai_game.fleet
+    aliens = fleet.all_sprites
+    bullets = ai_game.bullet_pool.sprites
+    explosions = (ai_game.alien_explosion_pool.sprites +
+                  ai_game.ship_explosion_pool.sprites)
+    entities = {
+        'aliens': entity_report(aliens),
+        'bullets': entity_report(bullets),
+        'explosions': entity_report(explosions),
+    }
+    arrays = sum(array.nbytes for array in
+                 (fleet.x, fleet.prev_x, fleet.y, fleet.alive,
+                  fleet.base_x, fleet.base_y))
+
+    # Every reference to a surface, grouped by what refers to it.
+    sources = {
+        'entities': [entity.image for entity in aliens + explosions
+                     if getattr(entity, 'image', None) is not None],
+        'ship': [ai_game.ship.image],
+        'assets': list(ai_game.assets.images.values()),
+        'explosion_sheets': [frame for sheet in
+                             ai_game.explosion_store.sheets.values()
+                             for frame in sheet.frames],
+        'starfield': ([ai_game.starfield.background] +
+                      ai_game.starfield.layers),
+        'screen': [ai_game.screen],
+    }
+    if ai_game.renderer:
+        sources['renderer'] = [ai_game.renderer.background]
+    if ai_game.viewport:
+        sources['viewport'] = [image
+            for images in ai_game.viewport.caches.values()
+            for image in images.values()]
+
+    references = {}
+    source_bytes = {}
+    for source, surfaces in sources.items():
+        owners = {id(surface_owner(surface)): surface_owner(surface)
+                  for surface in surfaces}
+        source_bytes[source] = sum(map(surface_bytes, owners.values()))
+        for surface in surfaces:
+            owner = surface_owner(surface)
+            count, _ = references.get(id(owner), (0, owner))
+            references[id(owner)] = (count + 1, owner)
+    unique_bytes = sum(surface_bytes(owner)
+                       for _, owner in references.values())
+
+    entity_total = sum(report['bytes'] for report in entities.values())
+    return {
+        'entities': entities,
+        'fleet_arrays_bytes': arrays,
+        'surfaces': {
+            'references': sum(count for count, _ in references.values()),
+            'unique': len(references),
+            'shared': sum(1 for count, _ in references.values()
+                          if count > 1),
+            'bytes': unique_bytes,
+            'bytes_by_source': source_bytes,
+        },
+        'total_bytes': entity_total + arrays + unique_bytes,
+    }
@@ -0,0 +1,74 @@
+class Pool:
+    """A class to reuse a fixed number of sprites instead of making new ones."""
+
+    def __init__(self, factory, capacity, group, recycle=False):
+        """
+        Hold up to capacity sprites made with factory. Sprites are only made
+            the first time they are needed. Acquired sprites are added to
+            group and return to the pool when they leave every group. With
+            recycle set, a full pool reuses its oldest sprite.
+        """
+        self.factory = factory
+        self.sprites = []
+        self.capacity = capacity
+        self.group = group
+        self.recycle = recycle
+        # Position to start looking for a free sprite from.
+        self.cursor = 0
+
+        # Usage counters for sizing the pool.
+        self.acquired = 0
+        self.recycled = 0
+        self.exhausted = 0
+        self.peak = 0
+
+    def acquire(self):
+        """Return a free sprite added to the group, or None if none are free."""
+        capacity = self.capacity
+        for offset in range(capacity):
+            index = (self.cursor + offset) % capacity
+            # Make the sprite for a slot that has not been used yet.
+            if index == len(self.sprites):
+                self.sprites.append(self.factory())
+            sprite = self.sprites[index]
+            # A sprite outside every group is free to use again.
+            if not sprite.alive():
+                break
+        else:
+            if not self.recycle or not capacity:
+                self.exhausted += 1
+                return None
+            index = self.cursor
+            sprite = self.sprites[index]
+            sprite.kill()
+            self.recycled += 1
+        self.cursor = (index + 1) % capacity
+        sprite.add(self.group)
+        self.acquired += 1
+        self.peak = max(self.peak, self.active)
+        return sprite
+
+    def resize(self, capacity):
+        """Grow or shrink the pool, dropping sprites beyond the new size."""
+        for sprite in self.sprites[capacity:]:
+            sprite.kill()
+        del self.sprites[capacity:]
+        self.capacity = capacity
+        self.cursor = 0
+
+    @property
+    def active(self):
+        """Return the number of sprites in use."""
+        return sum(1 for sprite in self.sprites if sprite.alive())
+
+    def stats(self):
+        """Return a dictionary of pool usage counters."""
+        return {
+            'capacity': self.capacity,
+            'built': len(self.sprites),
+            'active': self.active,
+            'peak': self.peak,
+            'acquired': self.acquired,
+            'recycled': self.recycled,
+            'exhausted': self.exhausted,
+        }
@@ -0,0 +1,157 @@
+import csv
+import json
+from collections import deque
+from time import perf_counter
+
+import pygame
+
+class FrameProfiler:
+    """A class to time each phase of a frame and report rolling stats."""
+
+    # Phases to time, as dotted attribute paths on the game object.
+    PHASES = [
+        '_check_events',
+        'ship.update',
+        '_update_bullets',
+        '_update_aliens',
+        '_update_explosions',
+        '_update_screen',
+        '_present',
+    ]
+
+    # Names shown for phases whose attribute name is not self-explanatory.
+    LABELS = {'_present': 'display.flip'}
+
+    def __init__(self, ai_game, log_path=None, window=300):
+        """Initialize the profiler and optionally open a per-frame log."""
+        self.game = ai_game
+        self.screen = ai_game.screen
+        self.names = [self.LABELS.get(phase, phase) for phase in self.PHASES]
+
+        # Time spent in each phase during the current frame.
+        self.times = dict.fromkeys(self.names, 0.0)
+        # Recent frames of every phase, plus the whole frame.
+        self.history = {name: deque(maxlen=window)
+                        for name in self.names + ['frame']}
+        self.frames = 0
+        self.frame_start = perf_counter()
+
+        # Per-frame log, written as CSV or JSON lines by file extension.
+        self.log_file = None
+        self.log_writer = None
+        if log_path:
+            self.log_file = open(log_path, 'w', newline='')
+            if log_path.endswith('.csv'):
+                self.log_writer = csv.writer(self.log_file)
+                self.log_writer.writerow(['frame', 'frame_ms'] + self.names)
+
+        # On-screen overlay, drawn like the Play button's text.
+        self.show_overlay = False
+        # Text is rendered through the game's shared text cache.
+        self.text_cache = ai_game.text_cache
+        self.font_size = 24
+        self.text_color = (0, 255, 0)
+        self.overlay_images = []
+        self.overlay_refresh = 30
+
+    def instrument(self):
+        """Replace each phase on the game with a timed wrapper."""
+        for phase, name in zip(self.PHASES, self.names):
+            owner = self.game
+            *path, attribute = phase.split('.')
+            for part in path:
+                owner = getattr(owner, part)
+            setattr(owner, attribute,
+                    self._timed(name, getattr(owner, attribute)))
+
+    def _timed(self, name, function):
+        """Return function wrapped to add its run time to a phase."""
+        times = self.times
+
+        def timed(*args, **kwargs):
+            start = perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                times[name] += perf_counter() - start
+        return timed
+
+    def end_frame(self):
+        """Record the finished frame and start timing the next one."""
+        now = perf_counter()
+        frame_time = now - self.frame_start
+        self.frame_start = now
+        self.frames += 1
+
+        self.history['frame'].append(frame_time)
+        for name in self.names:
+            self.history[name].append(self.times[name])
+        if self.log_file:
+            self._log(frame_time)
+        for name in self.names:
+            self.times[name] = 0.0
+
+    def _log(self, frame_time):
+        """Write the finished frame's timings in milliseconds."""
+        row = [round(frame_time * 1000, 4)] + [
+            round(self.times[name] * 1000, 4) for name in self.names]
+        if self.log_writer:
+            self.log_writer.writerow([self.frames] + row)
+        else:
+            record = dict(zip(['frame_ms'] + self.names, row))
+            record['frame'] = self.frames
+            self.log_file.write(json.dumps(record) + '\n')
+
+    def percentiles(self, name):
+        """Return the p50, p95 and p99 of a phase in milliseconds."""
+        values = sorted(self.history[name])
+        if not values:
+            return 0.0, 0.0, 0.0
+        last = len(values) - 1
+        return tuple(values[round(last * q)] * 1000
+                     for q in (0.50, 0.95, 0.99))
+
+    def stats(self):
+        """Return rolling percentiles for the frame and every phase."""
+        return {name: dict(zip(('p50', 'p95', 'p99'), self.percentiles(name)))
+                for name in ['frame'] + self.names}
+
+    def toggle_overlay(self):
+        """Show or hide the on-screen overlay."""
+        self.show_overlay = not self.show_overlay
+        self.overlay_images = []
+
+    def draw_overlay(self, surface=None):
+        """
+        Draw the overlay in the top left corner of the screen, or of surface
+            if given, and return its rect.
+        """
+        if surface is None:
+            surface = self.screen
+        # Only look up the text every few frames. Lines that have not
+        # changed are not rendered again.
+        if not self.overlay_images or self.frames % self.overlay_refresh == 0:
+            lines = ['phase (ms)          p50     p95     p99']
+            for name in ['frame'] + self.names:
+                p50, p95, p99 = self.percentiles(name)
+                lines.append(f'{name:<20}{p50:>6.2f}  {p95:>6.2f}  {p99:>6.2f}')
+            self.overlay_images = [self.text_cache.render(line,
+                self.font_size, self.text_color) for line in lines]
+            # Try again next frame while the font is still loading.
+            if None in self.overlay_images:
+                self.overlay_images = []
+
+        y = 10
+        left = 10
+        width = 0
+        for image in self.overlay_images:
+            surface.blit(image, (left, y))
+            width = max(width, image.get_width())
+            y += image.get_height()
+        return pygame.Rect(left, 10, width, y - 10)
+
+    def close(self):
+        """Close the per-frame log."""
+        if self.log_file:
+            self.log_file.close()
+            self.log_file = None
@@ -0,0 +1,82 @@
+import pygame
+
+class DirtyRenderer:
+    """A class to redraw and present only the changed areas of the screen."""
+
+    def __init__(self, ai_game):
+        """Initialize the renderer and draw the static background."""
+        self.game = ai_game
+        self.screen = ai_game.screen
+        self.screen_rect = self.screen.get_rect()
+        self.settings = ai_game.settings
+
+        # Areas drawn last frame, which must be erased this frame.
+        self.last_rects = []
+
+        # Pixels pushed to the display, for the last frame and in total.
+        self.frame_pixels = 0
+        self.total_pixels = 0
+        self.frames = 0
+        self.full_frame_pixels = self.screen_rect.width * self.screen_rect.height
+
+        self.build_background()
+
+    def build_background(self):
+        """Draw the background and stars once and show the whole screen."""
+        self.background = pygame.Surface(self.screen_rect.size).convert()
+        self.game.starfield.draw(self.background)
+        self.screen.blit(self.background, (0, 0))
+        self.game._present()
+        self.last_rects = []
+
+    def draw(self):
+        """Erase last frame's sprites, draw this frame's and update them."""
+        screen = self.screen
+        game = self.game
+
+        # A scrolling starfield changes the whole screen every frame.
+        full_frame = game.starfield.scrolling
+        if full_frame:
+            game.starfield.draw(screen)
+        else:
+            # Restore the background wherever something was drawn last frame.
+            for rect in self.last_rects:
+                screen.blit(self.background, rect, rect)
+
+        # Draw everything that moves and remember where it went.
+        rects = [self.screen_rect.clip(game.ship.rect)]
+        game.ship.blitme()
+        for bullet in game.bullets.sprites():
+            rects.append(pygame.draw.rect(screen, bullet.color, bullet.rect))
+        rects.extend(screen.blits(
+            [(alien.image, alien.rect) for alien in game.aliens.sprites()]))
+        rects.extend(screen.blits([(explosion.image, explosion.rect)
+            for explosion in game.explosions.sprites()]))
+        if game.state.waiting:
+            game.play_button.draw_button()
+            rects.append(game.play_button.rect.copy())
+        if game.profiler and game.profiler.show_overlay:
+            rects.append(game.profiler.draw_overlay())
+
+        # Present both the erased and the newly drawn areas.
+        if full_frame:
+            dirty = [self.screen_rect]
+        else:
+            dirty = self.last_rects + rects
+        game._present(dirty)
+        self.last_rects = rects
+
+        self.frame_pixels = sum(rect.width * rect.height for rect in dirty)
+        self.total_pixels += self.frame_pixels
+        self.frames += 1
+
+    def stats(self):
+        """Return pixel bandwidth compared with a full flip every frame."""
+        average = self.total_pixels / self.frames if self.frames else 0
+        return {
+            'frames': self.frames,
+            'frame_pixels': self.frame_pixels,
+            'average_pixels': average,
+            'full_frame_pixels': self.full_frame_pixels,
+            'fraction_of_full': average / self.full_frame_pixels,
+        }
@@ -0,0 +1,154 @@
+import json
+import struct
+
+import pygame
+
+# File header: magic, version, star map seed, fleet size and tick rate.
+# Seeds are signed 64 bit numbers.
+HEADER = struct.Struct('<4sBqII')
+MAGIC = b'SIRP'
+VERSION = 3
+# Headers of the versions this game can replay. Version 1 logs have no
+# settings changes, and versions 1 and 2 have 32 bit seeds.
+HEADERS = {
+    1: struct.Struct('<4sBIIH'),
+    2: struct.Struct('<4sBIIH'),
+    3: HEADER,
+}
+
+# One record per action: tick, action code and mouse position for clicks.
+# A settings change is followed by x bytes of the changed settings as JSON.
+RECORD = struct.Struct('<IBHH')
+
+# Action codes.
+END = 0
+KEYDOWN = {pygame.K_RIGHT: 1, pygame.K_LEFT: 2, pygame.K_SPACE: 3,
+           pygame.K_F5: 7, pygame.K_F9: 8}
+KEYUP = {pygame.K_RIGHT: 4, pygame.K_LEFT: 5}
+CLICK = 6
+SETTINGS = 9
+
+class Recorder:
+    """
+    A class to record the player's actions to a compact binary log. Each
+        action is written as it happens, so a game that crashes still
+        leaves a log of everything up to the crash.
+    """
+
+    def __init__(self, ai_game, path):
+        """Open the log and write the header needed to replay the game."""
+        self.game = ai_game
+        seed = ai_game.starfield.seed
+        if not -2 ** 63 <= seed < 2 ** 63:
+            raise ValueError(f"Only star map seeds that fit in 64 bits can "
+                             f"be recorded, not {seed}")
+        self.file = open(path, 'wb')
+        self.file.write(HEADER.pack(MAGIC, VERSION, seed, ai_game.num_aliens,
+            ai_game.settings.tick_rate))
+        self.file.flush()
+
+    def _record(self, code, x=0, y=0, payload=b''):
+        """Write an action at the current tick, and any data after it."""
+        if self.file:
+            self.file.write(RECORD.pack(self.game.ticks, code, x, y) +
+                            payload)
+            self.file.flush()
+
+    def keydown(self, key):
+        """Record a key press the game responds to."""
+        if key in KEYDOWN:
+            self._record(KEYDOWN[key])
+
+    def keyup(self, key):
+        """Record a key release the game responds to."""
+        if key in KEYUP:
+            self._record(KEYUP[key])
+
+    def click(self, mouse_pos):
+        """Record a mouse click."""
+        self._record(CLICK, *mouse_pos)
+
+    def settings(self, values):
+        """Record settings changed on the running game."""
+        payload = json.dumps(values).encode()
+        self._record(SETTINGS, len(payload), payload=payload)
+
+    def close(self):
+        """Mark the final tick and close the log."""
+        if self.file:
+            self._record(END)
+            self.file.close()
+            self.file = None
+
+class Replay:
+    """A class to feed a recorded log back into a game."""
+
+    def __init__(self, path):
+        """Read the header and every action from a log."""
+        with open(path, 'rb') as file:
+            data = file.read()
+        header = HEADERS.get(data[4] if len(data) > 4 else None)
+        if data[:4] != MAGIC or header is None or len(data) < header.size:
+            raise ValueError(f"{path} is not a replay this game can play")
+        _, _, self.seed, self.num_aliens, self.tick_rate = (
+            header.unpack_from(data))
+
+        # Records are tick, code, x and y, with the changed settings in
+        # place of x for a settings change. A log cut short by a crash has
+        # no end record, and may end part way through its last record.
+        self.records = []
+        offset = header.size
+        while offset + RECORD.size <= len(data):
+            tick, code, x, y = RECORD.unpack_from(data, offset)
+            offset += RECORD.size
+            if code == SETTINGS:
+                if offset + x > len(data):
+                    break
+                values = json.loads(data[offset:offset + x])
+                offset += x
+                # Colors are stored as lists but used as tuples.
+                x = {name: tuple(value) if isinstance(value, list) else value
+                     for name, value in values.items()}
+            self.records.append((tick, code, x, y))
+
+    def _apply(self, ai_game, code, x, y):
+        """Feed a single action to the game's event handlers."""
+        if code == CLICK:
+            ai_game._check_play_button((x, y))
+            return
+        if code == SETTINGS:
+            ai_game.apply_settings(x)
+            return
+        for key, key_code in KEYDOWN.items():
+            if key_code == code:
+                ai_game._check_keydown_events(
+                    pygame.event.Event(pygame.KEYDOWN, key=key))
+        for key, key_code in KEYUP.items():
+            if key_code == code:
+                ai_game._check_keyup_events(
+                    pygame.event.Event(pygame.KEYUP, key=key))
+
+    def play(self, ai_game, realtime=False):
+        """
+        Run the game through the log. In real time the game is drawn every
+            tick at the recorded tick rate; otherwise it runs as fast as
+            possible without drawing. Returns the number of ticks run.
+        """
+        clock = pygame.time.Clock()
+        for tick, code, x, y in self.records:
+            # Advance to the tick the action was taken on.
+            while ai_game.ticks < tick:
+                ai_game._update_game()
+                if realtime:
+                    self._show(ai_game, clock)
+            if code == END:
+                break
+            self._apply(ai_game, code, x, y)
+        return ai_game.ticks
+
+    def _show(self, ai_game, clock):
+        """Draw a tick and wait until the next one is due."""
+        for event in pygame.event.get(pygame.QUIT):
+            ai_game._quit()
+        ai_game._update_screen()
+        clock.tick(self.tick_rate)
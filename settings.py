@@ -1,17 +1,110 @@
+import os
+import json
+
+try:
+    import tomllib
+except ImportError:
+    # TOML profiles need Python 3.11 or later.
+    tomllib = None
+
+def read_settings_file(path):
+    """Return the settings in a TOML or JSON settings profile."""
+    with open(path, 'rb') as file:
+        if path.endswith('.toml'):
+            if tomllib is None:
+                raise ValueError("TOML settings need Python 3.11 or later")
+            values = tomllib.load(file)
+        else:
+            values = json.load(file)
+    # Colors are stored as lists in files but used as tuples.
+    return {name: tuple(value) if isinstance(value, list) else value
+            for name, value in values.items()}
+
 class Settings:
     """Class to store all settings for Space Invader."""
 
-    def __init__(self):
-        """Initialize the game's settings."""
+    # Least values of settings that count, size or divide by something.
+    MINIMUMS = {
+        'screen_width': 1,
+        'screen_height': 1,
+        'star_layers': 1,
+        'tick_rate': 1,
+        'frame_rate': 0,
+        'max_ticks_per_frame': 1,
+        'ship_limit': 0,
+        'ship_hit_pause_ticks': 0,
+        'wave_transition_ticks': 0,
+        'game_over_ticks': 0,
+        'bullet_width': 1,
+        'bullet_height': 1,
+        'bullets_allowed': 0,
+        'alien_explosion_limit': 1,
+        'ship_explosion_limit': 1,
+        'alien_explosion_ms': 1,
+        'ship_explosion_ms': 1,
+        'explosion_frames': 1,
+        'spectator_queue_size': 1,
+        'spectator_keyframe_frames': 1,
+    }
+
+    # Types of the settings that are None by default, when they are set.
+    OPTIONAL_TYPES = {
+        'window_size': tuple,
+        'star_seed': int,
+        'profile_log': str,
+        'spectator_port': int,
+    }
+
+    def __init__(self, path=None):
+        """
+        Initialize the game's settings, then override them with any found
+            in the settings profile at path.
+        """
 
         # Screen Settings
         self.screen_width = 1200
         self.screen_height = 700
         self.bg_color = (0, 0, 0)
+        # The game is always played at the screen size above, and shown
+        # scaled to fit a window of this size, or None for the screen size.
+        self.window_size = None
+        # Show the game scaled to fill the display. F11 switches modes.
+        self.fullscreen = False
+
+        # Star Settings
+        # Seed for the star map layout, None for a new layout each game.
+        self.star_seed = None
+        # Number of parallax layers, 1 for a static star map.
+        self.star_layers = 1
+        # Scroll speed of the nearest star layer in pixels per tick.
+        self.star_scroll_speed = 0.25
+
+        # Game Loop Settings
+        # Game logic runs at a fixed tick rate, independent of rendering.
+        self.tick_rate = 240
+        # Cap on rendered frames per second, 0 for no cap.
+        self.frame_rate = 60
+        # Most ticks to run in one frame when catching up.
+        self.max_ticks_per_frame = 10
+        # Draw moving objects between their last two tick positions.
+        self.interpolate = False
+        # Redraw and present only the changed parts of the screen.
+        self.dirty_rendering = False
+
+        # Profiling Settings
+        # Time each phase of the frame. F3 shows the overlay.
+        self.profiling = False
+        # File to log per-frame timings to, .csv or .jsonl, or None.
+        self.profile_log = None
 
         # Ship Settings
         self.ship_speed = 2.5
         self.ship_limit = 3
+        # Pause after the ship is hit, in game ticks (half a second).
+        self.ship_hit_pause_ticks = 120
+        # Pause between waves and before returning to the Play button.
+        self.wave_transition_ticks = 120
+        self.game_over_ticks = 480
 
         # Bullet Settings
         self.bullet_speed = 1.5
@@ -20,8 +113,126 @@ class Settings:
         self.bullet_color = (255, 255, 255)
         self.bullets_allowed = 4
 
+        # Explosion Settings
+        # Number of invader explosions that can be shown at once.
+        self.alien_explosion_limit = 32
+        self.ship_explosion_limit = 4
+        # Milliseconds each explosion plays for, and its animation frames.
+        self.alien_explosion_ms = 300
+        self.ship_explosion_ms = 500
+        self.explosion_frames = 8
+
         # Invader Settings
         self.alien_speed = 0.5
         self.fleet_drop_speed = 10
-        # fleet_direction of 1 represents right, -1 represents left.
-        self.fleet_direction = 1
+
+        # Spectator Settings
+        # Port to stream the game to spectators on, or None to not stream.
+        self.spectator_port = None
+        # Messages a spectator may fall behind by before frames are dropped.
+        self.spectator_queue_size = 8
+        # Frames between the full keyframes sent to spectators.
+        self.spectator_keyframe_frames = 60
+
+        # Collision Settings
+        # Check invader hits pixel for pixel rather than by rect alone.
+        self.mask_collisions = False
+
+        if path:
+            self.update(read_settings_file(path))
+
+    def check(self, name, value):
+        """
+        Raise an error if name is not a setting, or value is not the same
+            type as its current value or is out of range. Settings that are
+            None by default may be None or a value of their optional type.
+        """
+        if not hasattr(self, name):
+            raise AttributeError(f"Settings has no setting {name!r}")
+        if name in self.OPTIONAL_TYPES:
+            if value is None:
+                return
+            expected = self.OPTIONAL_TYPES[name]
+        else:
+            expected = type(getattr(self, name))
+        if expected is float:
+            # Whole numbers are fine where a float is expected.
+            valid = (isinstance(value, (int, float)) and
+                     not isinstance(value, bool))
+        elif expected is int:
+            valid = isinstance(value, int) and not isinstance(value, bool)
+        else:
+            valid = isinstance(value, expected)
+        if not valid:
+            raise ValueError(f"Setting {name!r} should be of type "
+                             f"{expected.__name__}, not {value!r}")
+
+        minimum = self.MINIMUMS.get(name)
+        if minimum is not None and value < minimum:
+            raise ValueError(f"Setting {name!r} should be at least "
+                             f"{minimum}, not {value!r}")
+        if name == 'window_size' and not (len(value) == 2 and
+                all(isinstance(size, int) and not isinstance(size, bool) and
+                    size >= 1 for size in value)):
+            raise ValueError(f"Setting {name!r} should be a width and "
+                             f"height of at least 1, not {value!r}")
+        if name == 'star_seed' and not -2 ** 63 <= value < 2 ** 63:
+            raise ValueError(f"Setting {name!r} should fit in 64 bits, "
+                             f"not {value!r}")
+        if name == 'spectator_port' and not 0 <= value <= 65535:
+            raise ValueError(f"Setting {name!r} should be a port from 0 "
+                             f"to 65535, not {value!r}")
+
+    def update(self, values):
+        """Set each named setting in values, rejecting bad names and values."""
+        for name, value in values.items():
+            self.check(name, value)
+        for name, value in values.items():
+            setattr(self, name, value)
+
+class SettingsWatcher:
+    """A class to notice when a settings profile changes on disk."""
+
+    def __init__(self, path, interval=0.5):
+        """Watch the file at path, checking at most every interval seconds."""
+        self.path = path
+        self.interval = interval
+        self.mtime = os.stat(path).st_mtime
+        self.values = read_settings_file(path)
+        self.next_check = 0.0
+        # Settings go back to these values when removed from the file.
+        self.defaults = Settings()
+
+    def poll(self, now):
+        """
+        Return the settings that changed since the last poll, if any.
+            Removed settings go back to their defaults, and bad names or
+            values are reported and left out.
+        """
+        if now < self.next_check:
+            return {}
+        self.next_check = now + self.interval
+        try:
+            mtime = os.stat(self.path).st_mtime
+            if mtime == self.mtime:
+                return {}
+            self.mtime = mtime
+            values = read_settings_file(self.path)
+        except (OSError, ValueError) as error:
+            # Keep the current settings while the file is half written.
+            print(f"Could not reload {self.path}: {error}")
+            return {}
+        changes = {name: value for name, value in values.items()
+                   if self.values.get(name) != value}
+        for name in self.values.keys() - values.keys():
+            if hasattr(self.defaults, name):
+                changes[name] = getattr(self.defaults, name)
+        self.values = values
+
+        for name, value in list(changes.items()):
+            try:
+                self.defaults.check(name, value)
+            except (AttributeError, ValueError) as error:
+                print(f"Ignoring {name} in {self.path}: {error}")
+                del changes[name]
+        return changes
@@ -9,8 +9,8 @@ class Ship:
         self.screen_rect = ai_game.screen.get_rect()
         self.settings = ai_game.settings
 
-        # Load the ship image and get its rect.
-        self.image = pygame.image.load('images/starship.bmp')
+        # Get the shared ship image and get its rect.
+        self.image = ai_game.assets.get('ship')
         self.rect = self.image.get_rect()
 
         # Start each new ship at the bottom center of the screen.
@@ -18,6 +18,7 @@ class Ship:
 
         # Store the decimal value for the ships horizontal position.
         self.x = float(self.rect.x)
+        self.prev_x = self.x
 
         # Movement flags.
         self.moving_right = False
@@ -25,6 +26,7 @@ class Ship:
 
     def update(self):
         """Update the ship's position based on movement flag."""
+        self.prev_x = self.x
         # Update ship's 'x' value, not the rect.
         if self.moving_right and self.rect.right < self.screen_rect.right:
             self.x += self.settings.ship_speed
@@ -42,3 +44,4 @@ class Ship:
         """Center the player ship on screen."""
         self.rect.midbottom = self.screen_rect.midbottom
         self.x = float(self.rect.x)
+        self.prev_x = self.x
@@ -0,0 +1,164 @@
+"""
+Save the whole simulation of a running game to a compact binary buffer and
+    restore it, for quick saves, rollback and branching many games from one
+    state. Only game state is saved. Settings, images and the star map's
+    seed are taken from the game a snapshot is restored into.
+"""
+import struct
+
+import numpy as np
+
+from entity import add_all
+from gamestate import GameState
+
+# Header: magic, version, ticks, game time, game state and its ticks left,
+# stats, ship, fleet and the number of bullets, explosions and star layers
+# that follow.
+HEADER = struct.Struct('<4sBIdBIiIIddiBIbddHHB')
+MAGIC = b'SISN'
+VERSION = 2
+
+# Game states by code.
+STATES = (GameState.ATTRACT, GameState.PLAYING, GameState.RESPAWNING,
+          GameState.WAVE_TRANSITION, GameState.GAME_OVER)
+
+# One record per bullet: rect x and y, and exact and previous y.
+BULLET = struct.Struct('<iidd')
+
+# One record per explosion: kind, rect x and y, start time, lifetime and
+# animation frame.
+EXPLOSION = struct.Struct('<BiiddB')
+
+def explosion_pools(ai_game):
+    """Return the explosion pools, indexed by the kind saved for them."""
+    return (ai_game.alien_explosion_pool, ai_game.ship_explosion_pool)
+
+def save(ai_game):
+    """Return the game's current state as bytes."""
+    fleet = ai_game.fleet
+    ship = ai_game.ship
+    stats = ai_game.stats
+    starfield = ai_game.starfield
+    bullets = ai_game.bullets.sprites()
+    explosions = ai_game.explosions.sprites()
+
+    buffer = bytearray(HEADER.pack(MAGIC, VERSION, ai_game.ticks,
+        ai_game.time_ms, STATES.index(ai_game.state.current),
+        ai_game.state.ticks_left, stats.ships_left, stats.aliens_destroyed,
+        stats.waves_cleared, ship.x, ship.prev_x, ship.rect.x,
+        ship.moving_left | ship.moving_right << 1,
+        len(fleet.x), fleet.direction, fleet.offset_x, fleet.offset_y,
+        len(bullets), len(explosions), len(starfield.offsets)))
+
+    # Fleet arrays, copied straight from numpy.
+    for array in (fleet.base_x, fleet.base_y, fleet.x, fleet.prev_x,
+            fleet.y):
+        buffer += array.tobytes()
+    buffer += fleet.alive.tobytes()
+
+    # Bullets and explosions in group order, which decides which bullet
+    # hits first and which explosion is drawn on top.
+    for bullet in bullets:
+        buffer += BULLET.pack(bullet.rect.x, bullet.rect.y, bullet.y,
+            bullet.prev_y)
+    pools = explosion_pools(ai_game)
+    for explosion in explosions:
+        kind = 0 if explosion in pools[0].sprites else 1
+        buffer += EXPLOSION.pack(kind, explosion.rect.x, explosion.rect.y,
+            explosion.start_time, explosion.lifetime,
+            explosion.frames.index(explosion.image))
+    buffer += struct.pack(f'<{len(starfield.offsets)}d', *starfield.offsets)
+    return bytes(buffer)
+
+def restore(ai_game, data):
+    """Put the game back into the state saved in data."""
+    (magic, version, ticks, time_ms, state, ticks_left, ships_left,
+        aliens_destroyed, waves_cleared, ship_x, ship_prev_x, ship_rect_x,
+        moving, count, direction, offset_x, offset_y, bullet_count,
+        explosion_count, layer_count) = HEADER.unpack_from(data)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError('Not a snapshot this version of the game can load')
+
+    ai_game.ticks = ticks
+    ai_game.time_ms = time_ms
+    ai_game.state.change(STATES[state], ticks_left)
+    stats = ai_game.stats
+    stats.ships_left = ships_left
+    stats.aliens_destroyed = aliens_destroyed
+    stats.waves_cleared = waves_cleared
+
+    ship = ai_game.ship
+    ship.x = ship_x
+    ship.prev_x = ship_prev_x
+    ship.rect.x = ship_rect_x
+    ship.moving_left = bool(moving & 1)
+    ship.moving_right = bool(moving & 2)
+
+    offset = HEADER.size
+    arrays = []
+    for _ in range(5):
+        arrays.append(np.frombuffer(data, float, count, offset))
+        offset += count * 8
+    alive = np.frombuffer(data, bool, count, offset)
+    offset += count
+    _restore_fleet(ai_game.fleet, *arrays, alive)
+    fleet = ai_game.fleet
+    fleet.direction = direction
+    fleet.offset_x = offset_x
+    fleet.offset_y = offset_y
+
+    # Take bullets from the pool again in their saved order.
+    ai_game.bullets.empty()
+    for _ in range(bullet_count):
+        rect_x, rect_y, y, prev_y = BULLET.unpack_from(data, offset)
+        offset += BULLET.size
+        bullet = ai_game.bullet_pool.acquire()
+        if not bullet:
+            continue
+        bullet.rect.x = rect_x
+        bullet.rect.y = rect_y
+        bullet.y = y
+        bullet.prev_y = prev_y
+
+    ai_game.explosions.empty()
+    pools = explosion_pools(ai_game)
+    for _ in range(explosion_count):
+        kind, x, y, start_time, lifetime, frame = EXPLOSION.unpack_from(
+            data, offset)
+        offset += EXPLOSION.size
+        explosion = pools[kind].acquire()
+        if not explosion:
+            continue
+        explosion.start(0, 0)
+        explosion.rect.topleft = (x, y)
+        explosion.start_time = start_time
+        explosion.lifetime = lifetime
+        explosion.image = explosion.frames[min(frame,
+            len(explosion.frames) - 1)]
+
+    starfield = ai_game.starfield
+    if layer_count == len(starfield.offsets):
+        starfield.offsets[:] = struct.unpack_from(f'<{layer_count}d', data,
+            offset)
+
+def _restore_fleet(fleet, base_x, base_y, x, prev_x, y, alive):
+    """Restore the fleet, only rebuilding it if its layout has changed."""
+    if not (np.array_equal(fleet.base_x, base_x) and
+            np.array_equal(fleet.base_y, base_y)):
+        fleet.build(base_x, base_y)
+    fleet.x[:] = x
+    fleet.prev_x[:] = prev_x
+    fleet.y[:] = y
+
+    # Only invaders whose alive flag changed join or leave the group.
+    changed = np.flatnonzero(fleet.alive != alive)
+    sprites = fleet.sprites
+    revived = []
+    for index in changed.tolist():
+        if alive[index]:
+            revived.append(sprites[index])
+        else:
+            sprites[index].remove(fleet.aliens)
+    add_all(fleet.aliens, revived)
+    fleet.alive[:] = alive
+    fleet.stale = True
@@ -1,166 +1,375 @@
+import argparse
+import os
 import sys
+from time import perf_counter
 import pygame
-from time import sleep
-import math
-from settings import Settings
+from settings import Settings, SettingsWatcher
 from gamestats import GameStats
+from gamestate import GameState
 from button import Button
 from ship import Ship
 from bullet import Bullet
-from invader import Alien
-from boom import Explosion, AlienExplosion, ShipExplosion
-from star import Star
-from random import randint
+from fleet import Fleet
+from collision import FleetCollider
+from boom import AlienExplosion, ShipExplosion, ExplosionStore
+from pool import Pool
+from profiler import FrameProfiler
+from replay import Recorder, Replay
+from starfield import Starfield
+from assets import Assets
+from renderer import DirtyRenderer
+from viewport import Viewport
+from text import TextCache
+from memory import memory_report
+import snapshot
+from spectator import SpectatorServer, StatePublisher, watch
 
 class SpaceInvaders:
     """Overall class to manage game assets and behaviors"""
 
-    def __init__(self, num_aliens = 36):
+    def __init__(self, num_aliens = 36, headless = False, seed = None,
+            record_path = None, settings_path = None, watch_settings = False):
         """Initialize game, and create game resources"""
-        pygame.init()
-        self.settings = Settings()
-
-        self.screen = pygame.display.set_mode(
-            (self.settings.screen_width, self.settings.screen_height))
+        # Milliseconds spent on each part of starting up.
+        self.startup_times = {}
+        self._startup_start = self._startup_mark = perf_counter()
+        # Headless mode runs the game logic without a real display.
+        self.headless = headless
+        if self.headless:
+            os.environ['SDL_VIDEODRIVER'] = 'dummy'
+        # Only the display is needed up front. The game has no sound, and
+        # fonts are loaded the first time text is drawn.
+        pygame.display.init()
+        self.settings = Settings(settings_path)
+        # Optionally reload the settings profile whenever it changes.
+        self.settings_watcher = None
+        if settings_path and watch_settings:
+            self.settings_watcher = SettingsWatcher(settings_path)
+
+        # The game is played at the screen size. A viewport shows it scaled
+        # when it is given another window size or is fullscreen.
+        screen_size = (self.settings.screen_width, self.settings.screen_height)
+        self.viewport = None
+        window_size = self.settings.window_size
+        if not self.headless and (self.settings.fullscreen or (window_size
+                and tuple(window_size) != screen_size)):
+            self.viewport = Viewport(self)
+            self.screen = pygame.Surface(screen_size).convert()
+        elif self.headless:
+            # Headless games draw to a surface of their own, so games run
+            # together in one process never draw over each other.
+            if not pygame.display.get_surface():
+                pygame.display.set_mode((1, 1))
+            self.screen = pygame.Surface(screen_size).convert()
+        else:
+            self.screen = pygame.display.set_mode(screen_size)
         pygame.display.set_caption('Space Invaders')
+        self._time_startup('display')
+        # Sprite images are loaded and converted once, on first use.
+        self.assets = Assets()
+        # Fonts and rendered text, shared by the button and the overlay.
+        self.text_cache = TextCache()
         # Create an instance to store game stats
         self.stats = GameStats(self)
+        # Start the game waiting for the player to press Play.
+        self.state = GameState()
         # Make the Play button
         self.play_button = Button(self, "Play")
         self.ship = Ship(self)
         self.bullets = pygame.sprite.Group()
         self.aliens = pygame.sprite.Group()
-        self.stars = pygame.sprite.Group()
         self.explosions = pygame.sprite.Group()
+        # Explosion animations are shared and updated together.
+        self.explosion_store = ExplosionStore(self)
+        # Bullets and explosions are reused rather than made for each use,
+        # and are only made the first time they are needed.
+        self.bullet_pool = Pool(lambda: Bullet(self),
+            self.settings.bullets_allowed, self.bullets)
+        self.alien_explosion_pool = Pool(lambda: AlienExplosion(self),
+            self.settings.alien_explosion_limit, self.explosions, True)
+        self.ship_explosion_pool = Pool(lambda: ShipExplosion(self),
+            self.settings.ship_explosion_limit, self.explosions, True)
 
         self.num_aliens = num_aliens
-
-        # Optional fullscreen mode. Replace lines 23 and 24 with lines 39 - 41
-        # self.screen = pygame.display.set_mode((0,0), pygame.FULLSCREEN)
-        # self.settings.screen_width = self.screen.get_rect().width
-        # self.settings.screen_height = self.screen.get_rect().height
+        # The fleet moves all invaders in the aliens group together.
+        self.fleet = Fleet(self)
+        # Collision masks, when pixel perfect collisions are turned on.
+        self.ship_mask = None
+        self.bullet_mask = None
+        alien_mask = None
+        if self.settings.mask_collisions:
+            alien_mask = self.assets.mask('alien')
+            self.ship_mask = self.assets.mask('ship')
+            self.bullet_mask = self.assets.solid_mask(
+                (self.settings.bullet_width, self.settings.bullet_height))
+        self.collider = FleetCollider(self.fleet, alien_mask)
+        # Ticks of game logic run so far, and the game time they add up to
+        # in milliseconds. The time is kept as it runs, so changing the
+        # tick rate does not change how long ago anything happened.
+        self.ticks = 0
+        self.time_ms = 0.0
+        self._time_startup('objects')
 
         self._create_fleet()
-        self._create_stars()
-
-    def _create_stars(self):
-        """Create a starmap"""
-        # Create a star and find the number of stars in a row.
-        # Spacing between each star is equal to two star width.
-        star = Star(self)
-        star_width, star_height = star.rect.size
-        # Calculate horizontal space between each star.
-        available_space_x = self.settings.screen_width - (star_width)
-        # Calculate number of stars per row across the screen.
-        star_amount_x = available_space_x // (2 * star_width)
-        # Determine the number of rows of stars that fit on the screen.
-        available_space_y = (self.settings.screen_height -
-                                (2 * star_height))
-        number_rows = available_space_y // (2 * star_height)
-
-        # Create the star map.
-        for star_row_num in range(number_rows):
-            for star_number in range(star_amount_x):
-                self._create_star(star_number, star_row_num)
-
-    def _create_star(self, star_number, star_row_number):
-        """Create stars and place them in the star map."""
-        star = Star(self)
-        star_width, star_height = star.rect.size
-        star.rect.x = 2.5 * star_width + 8 * star_width * star_number
-        star.rect.y = star.rect.height + 8 * star.rect.height * star_row_number
-
-        # Randomize star locations on screen.
-        star.rect.x += randint(-15, 15)
-        star.rect.y += randint(-15, 15)
-
-        self.stars.add(star)
+        self._time_startup('fleet')
+        # Bake the star map into the background once.
+        if seed is None:
+            seed = self.settings.star_seed
+        self.starfield = Starfield(self, seed)
+        self._time_startup('starfield')
+
+        # Optional log of the player's actions for replays.
+        self.recorder = None
+        if record_path:
+            self.recorder = Recorder(self, record_path)
+
+        # Quick save, made with F5 and loaded with F9, and how many times
+        # the game has been restored, so spectators are sent all of it.
+        self.quick_save = None
+        self.restores = 0
+
+        # Optional per-phase frame timing.
+        self.profiler = None
+        if self.settings.profiling:
+            self.enable_profiling(self.settings.profile_log)
+
+        # Optional renderer that only updates changed screen areas. A
+        # scaled viewport redraws the whole window instead.
+        self.renderer = None
+        if self.settings.dirty_rendering and not self.viewport:
+            self.renderer = DirtyRenderer(self)
+
+        # Optional stream of the game to spectators.
+        self.publisher = None
+        if self.settings.spectator_port is not None:
+            self.enable_spectators(self.settings.spectator_port)
+        self._time_startup('options')
+
+    # Note how long a part of starting up took.
+    def _time_startup(self, name):
+        """Record the time since the last startup mark under name."""
+        now = perf_counter()
+        self.startup_times[name] = (now - self._startup_mark) * 1000
+        self._startup_mark = now
 
     def _create_fleet(self):
         """Create the Invader Fleet"""
-        # Make an Invader Fleet by finding the number of invaders per row.
-        # Space between Invaders is equal to one Invader width.
-        alien = Alien(self)
-        alien_width, alien_height = alien.rect.size
-        # Calculate horizontal space between Invaders.
-        space_available_x = self.settings.screen_width - (2 * alien_width)
-        # Calculate number of Invaders per horizontal space.
-        alien_amount_x = space_available_x // (2 * alien_width)
-        # Calculate number of rows.
-        alien_amount_y = math.ceil(self.num_aliens / alien_amount_x)
-        # Keep count.
-        count = 0
-        for row_number in range(alien_amount_y):
-            for alien_number in range(alien_amount_x):
-                self._create_alien(alien_number, row_number)
-                count +=1
-                if count >= self.num_aliens:
-                    break
-
-        # Create the fleet of Invaders.
-        for row_number in range(alien_amount_y):
-            for alien_number in range(alien_amount_x):
-                self._create_alien(alien_number, row_number)
-
-    # Create a single invader
-    def _create_alien(self, alien_number, row_number):
-        """Create Invader and place it in the row."""
-        alien = Alien(self)
-        alien_width, alien_height = alien.rect.size
-        alien.x = alien_width + 2 * alien_width * alien_number
-        alien.rect.x = alien.x
-        alien.rect.y = alien.rect.height + 2 * alien.rect.height * row_number
-        self.aliens.add(alien)
+        xs, ys = self.fleet.layout(self.num_aliens)
+        self.fleet.build(xs, ys)
 
     # Create an explosion where an invader is destroyed
     def _create_alien_explosion(self, x, y):
         """Create an alien explosion and place it at x, y coordinates."""
-        explosion = AlienExplosion(self, x, y)
-        self.explosions.add(explosion)
+        explosion = self.alien_explosion_pool.acquire()
+        explosion.start(x, y)
 
     # Create an explosion when the player ship is destroyed
     def _create_ship_explosion(self, x, y):
         """Create a player ship explosion and place it at x, y coordinates."""
-        explosion = ShipExplosion(self, x, y)
-        self.explosions.add(explosion)
+        explosion = self.ship_explosion_pool.acquire()
+        explosion.start(x, y)
 
     # Create an instance of the player ship being hit by an invader
     def _ship_hit(self):
         """Respond to the ship being hit by an invader."""
+        # Only a ship in play can be hit.
+        if not self.state.playing:
+            return
         # Check the game state and adjust if conditions are met.
         if self.stats.ships_left > 0:
             # Decrement the amount of ships left
             self._create_ship_explosion(self.ship.rect.x, self.ship.rect.y)
             self.stats.ships_left -= 1
-            # Get rid of any remaining invaders and bullets
-            self.aliens.empty()
+            # Get rid of any remaining bullets
             self.bullets.empty()
+            # Pause and regroup while the next fleet is readied.
+            self.state.change(GameState.RESPAWNING,
+                self.settings.ship_hit_pause_ticks)
+        else:
+            self.state.change(GameState.GAME_OVER,
+                self.settings.game_over_ticks)
+
+    # Run a timed transition between states.
+    def _update_transition(self):
+        """Ready the next fleet and change state once the pause is over."""
+        state = self.state
+        if state.current in (GameState.RESPAWNING, GameState.WAVE_TRANSITION):
+            # Build the next fleet's sprites bit by bit during the pause.
+            self.fleet.prebuild(self.num_aliens)
+        if not state.tick():
+            return
+        if state.current == GameState.RESPAWNING:
             # Spawn a new fleet and center the player ship
             self._create_fleet()
             self.ship.center_ship()
-            # Pause and regroup
-            sleep(0.5)
-        else:
-            self.stats.game_active = False
+            state.change(GameState.PLAYING)
+        elif state.current == GameState.WAVE_TRANSITION:
+            self._create_fleet()
+            state.change(GameState.PLAYING)
+        elif state.current == GameState.GAME_OVER:
+            state.change(GameState.ATTRACT)
 
     def run_game(self):
         """Start the main game loop"""
+        clock = pygame.time.Clock()
+        accumulator = 0.0
         while True:
             self._check_events()
-            if self.stats.game_active:
-                self.ship.update()
-                self._update_bullets()
-                self._update_aliens()
-                self._update_explosions()
-
-            self._update_screen()
+            # Apply settings profile changes between ticks.
+            if self.settings_watcher:
+                changes = self.settings_watcher.poll(
+                    pygame.time.get_ticks() / 1000)
+                if changes:
+                    self.apply_settings(changes)
+            # Length of one game tick in milliseconds.
+            tick_time = 1000 / self.settings.tick_rate
+            # Run as many fixed ticks as the elapsed frame time calls for.
+            accumulator += clock.tick(self.settings.frame_rate)
+            ticks = 0
+            while (accumulator >= tick_time and
+                    ticks < self.settings.max_ticks_per_frame):
+                self._update_game()
+                accumulator -= tick_time
+                ticks += 1
+            # Drop time we could not catch up on rather than spiral.
+            if accumulator >= tick_time:
+                accumulator = 0.0
+
+            if self.settings.interpolate:
+                self._update_screen(accumulator / tick_time)
+            else:
+                self._update_screen()
+            if self.profiler:
+                self.profiler.end_frame()
+            if self.publisher:
+                self.publisher.publish()
+
+    # Turn on timing of each phase of the game loop.
+    def enable_profiling(self, log_path=None):
+        """Start timing each frame, optionally logging it to log_path."""
+        if not self.profiler:
+            self.profiler = FrameProfiler(self, log_path)
+            self.profiler.instrument()
+
+    # Stream the game to spectators.
+    def enable_spectators(self, port=0, host='127.0.0.1'):
+        """Serve the game to spectators on host and port after each frame."""
+        if not self.publisher:
+            server = SpectatorServer(host, port,
+                self.settings.spectator_queue_size)
+            self.publisher = StatePublisher(self, server,
+                self.settings.spectator_keyframe_frames)
+
+    # Advance the game logic by a single tick.
+    def _update_game(self):
+        """Update all game objects for one tick of play."""
+        self.ticks += 1
+        self.time_ms += 1000 / self.settings.tick_rate
+        if self.starfield.scrolling:
+            self.starfield.update()
+        if self.state.current == GameState.ATTRACT:
+            return
+        if not self.state.playing:
+            # Let explosions play out between states.
+            self._update_explosions()
+            self._update_transition()
+            return
+        self.ship.update()
+        self._update_bullets()
+        if self.state.playing:
+            self._update_aliens()
+        self._update_explosions()
+
+    # Run the game for a number of ticks without drawing anything.
+    def step(self, actions=(), n_ticks=1):
+        """
+        Apply actions, then advance the game n_ticks without rendering.
+            Actions are 'play', 'left', 'right' and 'fire'; movement holds
+            for the whole step and 'fire' shoots once on the first tick.
+        """
+        actions = set(actions)
+        if 'play' in actions and self.state.waiting:
+            self._start_game()
+        self.ship.moving_left = 'left' in actions
+        self.ship.moving_right = 'right' in actions
+        if 'fire' in actions and self.state.playing:
+            self._fire_bullet()
+        for tick in range(n_ticks):
+            self._update_game()
+        return {
+            'aliens': len(self.aliens),
+            'bullets': len(self.bullets),
+            'ships_left': self.stats.ships_left,
+            'state': self.state.current,
+        }
+
+    # Change settings on a running game.
+    def apply_settings(self, values):
+        """
+        Set each named setting in values and update what depends on it.
+            Screen size changes only take effect on restart.
+        """
+        settings = self.settings
+        settings.update(values)
+        # Replays need every change made during the game to play it back.
+        if self.recorder:
+            self.recorder.settings(values)
+        if 'bullets_allowed' in values:
+            self.bullet_pool.resize(settings.bullets_allowed)
+        if values.keys() & {'bullet_width', 'bullet_height', 'bullet_color'}:
+            for bullet in self.bullet_pool.sprites:
+                bullet.rect.size = (settings.bullet_width,
+                    settings.bullet_height)
+                bullet.color = settings.bullet_color
+            if self.bullet_mask:
+                self.bullet_mask = self.assets.solid_mask(
+                    (settings.bullet_width, settings.bullet_height))
+        if 'alien_explosion_limit' in values:
+            self.alien_explosion_pool.resize(settings.alien_explosion_limit)
+        if 'ship_explosion_limit' in values:
+            self.ship_explosion_pool.resize(settings.ship_explosion_limit)
+        if 'explosion_frames' in values:
+            self.explosion_store.clear()
+            if self.viewport:
+                self.viewport.clear()
+        if values.keys() & {'bg_color', 'star_layers', 'star_scroll_speed'}:
+            self.starfield.bake(self.screen.get_size())
+            if self.renderer:
+                self.renderer.build_background()
+            if self.viewport:
+                self.viewport.clear()
+
+    # Report how the sprite pools are being used.
+    def pool_stats(self):
+        """Return usage counters for the bullet and explosion pools."""
+        return {
+            'bullets': self.bullet_pool.stats(),
+            'alien_explosions': self.alien_explosion_pool.stats(),
+            'ship_explosions': self.ship_explosion_pool.stats(),
+        }
+
+    # Report how much memory the game holds.
+    def memory_report(self):
+        """Return bytes per entity type and shared and unique surfaces."""
+        return memory_report(self)
+
+    # Save the state of the game.
+    def snapshot(self):
+        """Return the whole simulation state as compact bytes."""
+        return snapshot.save(self)
+
+    # Put the game back into a saved state.
+    def restore(self, data):
+        """Restore the simulation state saved by snapshot()."""
+        snapshot.restore(self, data)
+        self.restores += 1
 
     # Look for keyboard and mouse events.
     def _check_events(self):
         """Respond to keypresses and mouse events."""
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
-                sys.exit()
+                self._quit()
             # Movement controls for the starship.
             elif event.type == pygame.KEYDOWN:
                 self._check_keydown_events(event)
@@ -168,38 +377,82 @@ class SpaceInvaders:
                 self._check_keyup_events(event)
             elif event.type == pygame.MOUSEBUTTONDOWN:
                 mouse_pos = pygame.mouse.get_pos()
-                self._check_play_button(mouse_pos)
+                # Clicks in the bars around a scaled game hit nothing.
+                if self.viewport:
+                    mouse_pos = self.viewport.to_screen(mouse_pos)
+                if mouse_pos:
+                    self._check_play_button(mouse_pos)
+            elif event.type == pygame.VIDEORESIZE and self.viewport:
+                self.viewport.window_resized(event.size)
 
     # Look for play button events.
     def _check_play_button(self, mouse_pos):
         """Start a new game when the player clicks Play."""
-        if self.play_button.rect.collidepoint(mouse_pos):
-            # Reset game statistics.
-            self.stats.reset_stats()
-            self.stats.game_active = True
-
-            # Eliminate any remaining invaders and bullets
-            self.aliens.empty()
-            self.bullets.empty()
-
-            # Create a new fleet and recenter the player ship
-            self._create_fleet()
-            self.ship.center_ship()
+        if self.recorder:
+            self.recorder.click(mouse_pos)
+        if (self.play_button.rect.collidepoint(mouse_pos) and
+                self.state.waiting):
+            self._start_game()
+
+    # Start a new game.
+    def _start_game(self):
+        """Reset the game state and begin play."""
+        # Reset game statistics.
+        self.stats.reset_stats()
+        self.state.change(GameState.PLAYING)
+
+        # Eliminate any remaining invaders and bullets
+        self.aliens.empty()
+        self.bullets.empty()
+
+        # Create a new fleet and recenter the player ship
+        self._create_fleet()
+        self.ship.center_ship()
 
     # Actions take when keys are pressed down.
     def _check_keydown_events(self, event):
+        if self.recorder:
+            self.recorder.keydown(event.key)
         if event.key == pygame.K_RIGHT:
             self.ship.moving_right = True
         elif event.key == pygame.K_LEFT:
             self.ship.moving_left = True
         # Press Q to quit. Required for Fullscreen mode.
         elif event.key == pygame.K_q:
-            sys.exit()
+            self._quit()
+        # Press F11 to switch between fullscreen and a window.
+        elif event.key == pygame.K_F11 and self.viewport:
+            self.viewport.toggle_fullscreen()
+        # Press F3 to show or hide the profiler overlay.
+        elif event.key == pygame.K_F3 and self.profiler:
+            self.profiler.toggle_overlay()
+        # Press F5 to quick save and F9 to load the quick save.
+        elif event.key == pygame.K_F5:
+            self.quick_save = self.snapshot()
+        elif event.key == pygame.K_F9 and self.quick_save:
+            self.restore(self.quick_save)
         elif event.key == pygame.K_SPACE:
             self._fire_bullet()
 
+    # Close the game down.
+    def _quit(self):
+        """Finish any logging and exit."""
+        if self.profiler:
+            self.profiler.close()
+        if self.recorder:
+            self.recorder.close()
+        if self.publisher:
+            for client in self.publisher.server.stats():
+                print(f"Spectator {client['address']}: "
+                      f"{client['bytes_per_second']:.0f} bytes/s, "
+                      f"{client['dropped']} messages dropped.")
+            self.publisher.server.close()
+        sys.exit()
+
     # Actions taken when keys are released.
     def _check_keyup_events(self, event):
+        if self.recorder:
+            self.recorder.keyup(event.key)
         if event.key == pygame.K_RIGHT:
             self.ship.moving_right = False
         elif event.key == pygame.K_LEFT:
@@ -208,50 +461,50 @@ class SpaceInvaders:
     # Check if the fleet has reached an edge of the screen.
     def _check_fleet_edges(self):
         """Respond appropriately if an invader reaches an edge."""
-        for alien in self.aliens.sprites():
-            if alien.check_edge():
-                self._change_direction()
-                break
+        if self.fleet.at_edge():
+            self._change_direction()
 
     # Change the fleet direction on-screen when reaching the edge.
     def _change_direction(self):
         """Drop entire fleet and change movement direction"""
-        for alien in self.aliens.sprites():
-            alien.rect.y += self.settings.fleet_drop_speed
-        self.settings.fleet_direction *= -1
+        self.fleet.drop(self.settings.fleet_drop_speed)
+        self.fleet.direction *= -1
 
     # Firing a bullet functionality.
     def _fire_bullet(self):
         """Create a new bullet and add it to the bullets group."""
-        if len(self.bullets) < self.settings.bullets_allowed:
-            new_bullet = Bullet(self)
-            self.bullets.add(new_bullet)
+        if (self.state.playing and
+                len(self.bullets) < self.settings.bullets_allowed):
+            new_bullet = self.bullet_pool.acquire()
+            if new_bullet:
+                new_bullet.fire(self.ship.rect.midtop)
 
     # Update bullets in-game.
     def _update_bullets(self):
         """Update the position of bullets and delete old bullets"""
-        self.bullets.update()
-        # Delete bullets that have disappeared.
-        for bullet in self.bullets.copy():
-            if bullet.rect.bottom <= 0:
-                self.bullets.remove(bullet)
+        # Bullets remove themselves once they have disappeared.
+        self.bullets.update(self.settings.bullet_speed)
         self._check_bullet_alien_collisions()
 
     def _check_bullet_alien_collisions(self):
         """Respond to bullet-alien collision events."""
         # Check for bullet collison with invaders and remove bullet and
         # invader if collison is detected.
-        collisions = pygame.sprite.groupcollide(
-                self.bullets, self.aliens, True, True)
+        collisions = self.collider.bullet_hits(self.bullets.sprites(),
+            self.bullet_mask)
         for bullet in collisions:
-            aliens = collisions[bullet]
-            for alien in aliens:
+            bullet.kill()
+            for index in collisions[bullet]:
+                self.fleet.sprites[index].kill()
                 # Create alien explosion
-                self._create_alien_explosion(alien.rect.x, alien.rect.y)
+                self._create_alien_explosion(*self.fleet.position(index))
+                self.stats.aliens_destroyed += 1
         if not self.aliens:
-            # Destory existing bullets and create a new fleet.
+            # Destory existing bullets and ready a new fleet.
             self.bullets.empty()
-            self._create_fleet()
+            self.stats.waves_cleared += 1
+            self.state.change(GameState.WAVE_TRANSITION,
+                self.settings.wave_transition_ticks)
 
     # Update invaders in-game.
     def _update_aliens(self):
@@ -260,52 +513,131 @@ class SpaceInvaders:
             invaders in the fleet.
         """
         self._check_fleet_edges()
-        self.aliens.update()
+        self.fleet.update(self.settings.alien_speed)
         # Check if an alien reaches the bottom.
         self._check_alien_bottom()
         # Check for alien collision with ship.
-        for alien in self.aliens:
-            #if pygame.sprite.collide_rect(self.ship, alien):
-            if pygame.sprite.spritecollideany(self.ship, self.aliens):
-                # Create ship explosion
-                self._create_ship_explosion(self.ship.rect.x, self.ship.rect.y)
-                self._ship_hit()
-                return
+        if self.state.playing and self.collider.collides(self.ship.rect,
+                self.ship_mask):
+            # Create ship explosion
+            self._create_ship_explosion(self.ship.rect.x, self.ship.rect.y)
+            self._ship_hit()
 
     # Check for invaders reaching the bottom of the screen.
     def _check_alien_bottom(self):
         """Check if any aliens have reached the bottom of the screen."""
-        screen_rect = self.screen.get_rect()
-        for alien in self.aliens.sprites():
-            if alien.rect.bottom >= screen_rect.bottom:
-                # React in the same way as if the player ship has been hit.
-                self._create_ship_explosion(self.ship.rect.x, self.ship.rect.y)
-                self._ship_hit()
-                break
+        if self.fleet.reached_bottom():
+            # React in the same way as if the player ship has been hit.
+            self._create_ship_explosion(self.ship.rect.x, self.ship.rect.y)
+            self._ship_hit()
 
     # Update explosions.
     def _update_explosions(self):
         """Update all explosions in-game."""
-        self.explosions.update()
+        self.explosion_store.update()
+
+    # Place moving objects part way between ticks for smoother drawing.
+    def _interpolate(self, alpha):
+        """
+        Set ship, bullet and invader rects between their previous and
+            current positions. An alpha of 1 restores the current positions.
+        """
+        back = 1 - alpha
+        self.ship.rect.x = self.ship.x - (self.ship.x - self.ship.prev_x) * back
+        for bullet in self.bullets.sprites():
+            bullet.rect.y = bullet.y - (bullet.y - bullet.prev_y) * back
+        self.fleet.sync(alpha)
 
     # Redraw the screen during each loop pass.
-    def _update_screen(self):
+    def _update_screen(self, alpha=1.0):
         """Update images on screen, and flip to a new screen."""
-        self.screen.fill(self.settings.bg_color)
-        self.stars.draw(self.screen)
+        if alpha < 1.0:
+            self._interpolate(alpha)
+        else:
+            self.fleet.sync()
+        if self.viewport:
+            self.viewport.draw()
+        elif self.renderer:
+            self.renderer.draw()
+        else:
+            self._draw_full_screen()
+        if alpha < 1.0:
+            self._interpolate(1.0)
+        if 'first_frame' not in self.startup_times:
+            self._time_startup('first_frame')
+            self.startup_times['total'] = (
+                self._startup_mark - self._startup_start) * 1000
+
+    # Draw the stars and everything in play.
+    def _draw_objects(self):
+        """Draw the starfield and every game object to the screen."""
+        self.starfield.draw(self.screen)
         self.ship.blitme()
         for bullet in self.bullets.sprites():
-            bullet.draw_bullet()
+            bullet.draw_bullet(self.screen)
         self.aliens.draw(self.screen)
         self.explosions.draw(self.screen)
+
+    # Redraw everything and flip the whole screen.
+    def _draw_full_screen(self):
+        """Draw every object to the screen and flip to a new screen."""
+        self._draw_objects()
         # Draw the play button to the screen if the game is inactive
-        if not self.stats.game_active:
+        if self.state.waiting:
             self.play_button.draw_button()
+        if self.profiler and self.profiler.show_overlay:
+            self.profiler.draw_overlay()
 
         # Make the most recently drawn screen visible.
-        pygame.display.flip()
+        self._present()
+
+    # Show the drawn screen.
+    def _present(self, rects=None):
+        """Flip the whole screen, or update only the given rects."""
+        if rects is None:
+            pygame.display.flip()
+        else:
+            pygame.display.update(rects)
 
 if __name__ == '__main__':
-    # Make a game instance and run the game.
-    ai = SpaceInvaders()
-    ai.run_game()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description='Play Space Invaders.')
+    parser.add_argument('--record', metavar='FILE',
+        help='record the game to FILE')
+    parser.add_argument('--replay', metavar='FILE',
+        help='replay a game recorded to FILE')
+    parser.add_argument('--fast-forward', action='store_true',
+        help='replay as fast as possible without drawing')
+    parser.add_argument('--settings', metavar='FILE',
+        help='load settings from a TOML or JSON file')
+    parser.add_argument('--watch', action='store_true',
+        help='reload the settings file whenever it changes')
+    parser.add_argument('--serve', type=int, metavar='PORT',
+        help='stream the game to spectators on PORT')
+    parser.add_argument('--spectate', metavar='HOST:PORT',
+        help='watch a game streamed from HOST:PORT')
+    args = parser.parse_args()
+
+    if args.spectate:
+        host, _, port = args.spectate.rpartition(':')
+        watch(host or 'localhost', int(port))
+    elif args.replay:
+        # Rebuild the recorded game and feed it the recorded actions.
+        replay = Replay(args.replay)
+        ai = SpaceInvaders(replay.num_aliens, headless=args.fast_forward,
+            seed=replay.seed, settings_path=args.settings)
+        ticks = replay.play(ai, realtime=not args.fast_forward)
+        print(f"Replayed {ticks} ticks, {ai.stats.ships_left} ships left, "
+              f"{len(ai.aliens)} invaders left.")
+    else:
+        # Make a game instance and run the game.
+        ai = SpaceInvaders(record_path=args.record,
+            settings_path=args.settings, watch_settings=args.watch)
+        if args.serve is not None:
+            ai.enable_spectators(args.serve)
+        try:
+            ai.run_game()
+        finally:
+            # Mark the tick a crashed game stopped on, so that its replay
+            # runs up to the crash.
+            if ai.recorder:
+                ai.recorder.close()
\ No newline at end of file
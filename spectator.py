@@ -0,0 +1,433 @@
+"""
+Stream a running game to spectators in other processes. The game publishes
+    a delta of what changed after each frame it draws, with a full keyframe
+    from time to time, to an asyncio server on a background thread. Every
+    spectator has a bounded queue, and a spectator that falls behind has
+    frames dropped until the next keyframe rather than holding up the game.
+    Watch a game started with --serve 8765 with:
+
+    python spaceinvader.py --spectate localhost:8765
+"""
+import asyncio
+import socket
+import struct
+import threading
+from collections import deque
+from time import perf_counter
+
+import numpy as np
+
+import snapshot
+
+# Every message is sent with its length first.
+LENGTH = struct.Struct('<I')
+
+# Message types.
+KEYFRAME = 1
+DELTA = 2
+
+# Keyframe header: type and number of bullet pool slots that follow, in
+# the order the snapshot's bullets are in.
+KEYFRAME_HEADER = struct.Struct('<BI')
+SLOT = struct.Struct('<I')
+
+# Delta header: type, ticks, game time, game state, ships left, ship x,
+# fleet offsets, how far surviving bullets moved, and the number of
+# invaders destroyed, bullets culled, bullets spawned and explosions started
+# that follow. Counts and indices are 32 bit, so no fleet or bullet limit
+# can overflow.
+DELTA_HEADER = struct.Struct('<BIdBihdddIIII')
+KILLED = struct.Struct('<I')
+CULLED = SLOT
+# Bullet pool slot, rect x and exact y.
+SPAWNED = struct.Struct('<Ihd')
+# Explosion kind, rect x and y, start time and lifetime.
+STARTED = struct.Struct('<Bhhdd')
+
+class StatePublisher:
+    """A class to encode a game's changes since it was last published."""
+
+    def __init__(self, ai_game, server, keyframe_frames=60):
+        """Publish to server, sending a keyframe every keyframe_frames."""
+        self.game = ai_game
+        self.server = server
+        self.keyframe_frames = keyframe_frames
+        self.frames = 0
+        # What spectators were last sent, to find what has changed.
+        self.generation = None
+        self.restores = None
+        self.alive = None
+        self.bullets = {}
+        self.time = 0.0
+
+    def publish(self):
+        """Send the game's changes, or a keyframe, to every spectator."""
+        server = self.server
+        if not server.clients:
+            # Nobody is watching, so start afresh with the next spectator.
+            self.generation = None
+            return
+        game = self.game
+        # A restored game can go back in time and bring invaders back,
+        # which a delta cannot describe.
+        keyframe = (server.keyframe_requested or
+                    game.fleet.generation != self.generation or
+                    game.restores != self.restores or
+                    self.frames >= self.keyframe_frames)
+        bullets = self._bullets()
+        if keyframe:
+            server.keyframe_requested = False
+            message = self._keyframe(bullets)
+            self.frames = 0
+        else:
+            message = self._delta(bullets)
+            self.frames += 1
+        server.publish(message, keyframe)
+
+        self.generation = game.fleet.generation
+        self.restores = game.restores
+        self.alive = game.fleet.alive.copy()
+        self.bullets = {slot: bullet.y for slot, bullet in bullets.items()}
+        self.time = game.explosion_store.now()
+
+    def _bullets(self):
+        """Return the live bullets by their slot in the bullet pool."""
+        return {slot: bullet for slot, bullet in
+                enumerate(self.game.bullet_pool.sprites) if bullet.alive()}
+
+    def _keyframe(self, bullets):
+        """Encode the whole game, with the slot of each bullet."""
+        slots = {id(bullet): slot for slot, bullet in bullets.items()}
+        order = [slots[id(bullet)] for bullet in self.game.bullets.sprites()]
+        return (KEYFRAME_HEADER.pack(KEYFRAME, len(order)) +
+                struct.pack(f'<{len(order)}I', *order) + self.game.snapshot())
+
+    def _delta(self, bullets):
+        """Encode what has changed since the last message."""
+        game = self.game
+        fleet = game.fleet
+        killed = np.flatnonzero(self.alive & ~fleet.alive).tolist()
+
+        # Bullets move together, so one distance covers every survivor. A
+        # slot whose bullet moved down was culled and fired again.
+        culled = []
+        spawned = []
+        moved = 0.0
+        for slot, last_y in self.bullets.items():
+            bullet = bullets.get(slot)
+            if not bullet or bullet.y > last_y:
+                culled.append(slot)
+            else:
+                moved = bullet.y - last_y
+        for slot, bullet in bullets.items():
+            if slot not in self.bullets or slot in culled:
+                spawned.append((slot, bullet.rect.x, bullet.y))
+
+        pools = snapshot.explosion_pools(game)
+        started = [(kind, explosion.rect.x, explosion.rect.y,
+                    explosion.start_time, explosion.lifetime)
+                   for kind, pool in enumerate(pools)
+                   for explosion in pool.sprites
+                   if explosion.alive() and explosion.start_time > self.time]
+
+        message = bytearray(DELTA_HEADER.pack(DELTA, game.ticks,
+            game.time_ms, snapshot.STATES.index(game.state.current),
+            game.stats.ships_left, game.ship.rect.x, fleet.offset_x,
+            fleet.offset_y, moved, len(killed), len(culled), len(spawned),
+            len(started)))
+        for index in killed:
+            message += KILLED.pack(index)
+        for slot in culled:
+            message += CULLED.pack(slot)
+        for values in spawned:
+            message += SPAWNED.pack(*values)
+        for values in started:
+            message += STARTED.pack(*values)
+        return bytes(message)
+
+class Spectator:
+    """A class to track one connected spectator and what it has been sent."""
+
+    def __init__(self, writer, queue_size):
+        """Initialize a spectator waiting for its first keyframe."""
+        self.writer = writer
+        self.address = writer.get_extra_info('peername')
+        self.queue = asyncio.Queue(queue_size)
+        # Deltas only make sense on top of the keyframe before them.
+        self.synced = False
+        self.connected = perf_counter()
+        self.bytes_sent = 0
+        self.messages_sent = 0
+        self.dropped = 0
+
+    def stats(self):
+        """Return a dictionary of what the spectator has been sent."""
+        seconds = max(perf_counter() - self.connected, 1e-9)
+        return {
+            'address': self.address,
+            'bytes_sent': self.bytes_sent,
+            'messages_sent': self.messages_sent,
+            'dropped': self.dropped,
+            'queued': self.queue.qsize(),
+            'bytes_per_second': self.bytes_sent / seconds,
+        }
+
+class SpectatorServer:
+    """A class to serve a game to spectators from a background thread."""
+
+    # Bytes the system may buffer for each spectator. Kept small, so a
+    # spectator that stops reading backs up into its own queue and has
+    # frames dropped, rather than being sent stale frames for seconds.
+    SEND_BUFFER = 8192
+
+    def __init__(self, host='127.0.0.1', port=0, queue_size=8):
+        """Start serving on host and port; port 0 picks a free port."""
+        self.host = host
+        self.queue_size = queue_size
+        self.clients = []
+        self.keyframe_requested = False
+        self.loop = asyncio.new_event_loop()
+        ready = threading.Event()
+        self.thread = threading.Thread(target=self._run,
+            args=(port, ready), daemon=True)
+        self.error = None
+        self.thread.start()
+        ready.wait()
+        if self.error:
+            raise self.error
+
+    def _run(self, port, ready):
+        """Run the server's event loop until it is closed."""
+        asyncio.set_event_loop(self.loop)
+        try:
+            self.server = self.loop.run_until_complete(
+                asyncio.start_server(self._serve, self.host, port))
+        except OSError as error:
+            # Let the game's thread raise the error, such as a port in use.
+            self.error = error
+            ready.set()
+            return
+        self.port = self.server.sockets[0].getsockname()[1]
+        ready.set()
+        self.loop.run_forever()
+
+    async def _serve(self, reader, writer):
+        """Send one spectator its queued messages until it disconnects."""
+        client = Spectator(writer, self.queue_size)
+        writer.get_extra_info('socket').setsockopt(socket.SOL_SOCKET,
+            socket.SO_SNDBUF, self.SEND_BUFFER)
+        writer.transport.set_write_buffer_limits(self.SEND_BUFFER)
+        self.clients.append(client)
+        self.keyframe_requested = True
+        try:
+            while True:
+                message = await client.queue.get()
+                if message is None:
+                    break
+                writer.write(LENGTH.pack(len(message)) + message)
+                await writer.drain()
+                client.bytes_sent += LENGTH.size + len(message)
+                client.messages_sent += 1
+        except (ConnectionError, OSError):
+            pass
+        finally:
+            self.clients.remove(client)
+            writer.close()
+
+    def publish(self, message, keyframe=False):
+        """Queue a message for every spectator without waiting."""
+        self.loop.call_soon_threadsafe(self._broadcast, message, keyframe)
+
+    def _broadcast(self, message, keyframe):
+        """Queue a message on the event loop, dropping it for full queues."""
+        for client in self.clients:
+            queue = client.queue
+            if keyframe:
+                # A keyframe replaces anything still waiting to be sent.
+                while not queue.empty():
+                    queue.get_nowait()
+                    client.dropped += 1
+                client.synced = True
+            elif not client.synced:
+                client.dropped += 1
+                continue
+            try:
+                queue.put_nowait(message)
+            except asyncio.QueueFull:
+                # Wait for the next keyframe rather than send a gap.
+                client.dropped += 1
+                client.synced = False
+
+    def stats(self):
+        """Return the bandwidth and drops of every spectator."""
+        return [client.stats() for client in list(self.clients)]
+
+    async def _shutdown(self):
+        """Stop accepting spectators and disconnect the ones connected."""
+        self.server.close()
+        for client in self.clients:
+            # Abort sends in progress and wake spectators waiting for more.
+            client.writer.transport.abort()
+            while not client.queue.empty():
+                client.queue.get_nowait()
+            client.queue.put_nowait(None)
+        while self.clients:
+            await asyncio.sleep(0.01)
+
+    def close(self):
+        """Stop serving and wait for the server thread to finish."""
+        asyncio.run_coroutine_threadsafe(self._shutdown(), self.loop).result()
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
+        self.loop.close()
+
+class SpectatorClient:
+    """A class to rebuild a published game in a local game for drawing."""
+
+    def __init__(self, ai_game, host, port):
+        """Connect to a game and start receiving its messages."""
+        self.game = ai_game
+        self.socket = socket.create_connection((host, port))
+        self.messages = deque()
+        self.connected = True
+        self.bytes_received = 0
+        self.started = perf_counter()
+        # The local bullet for each of the published game's pool slots.
+        self.bullets = {}
+        self.synced = False
+        self.thread = threading.Thread(target=self._receive, daemon=True)
+        self.thread.start()
+
+    def _read(self, size):
+        """Read exactly size bytes, or None once the game has gone."""
+        data = bytearray()
+        while len(data) < size:
+            chunk = self.socket.recv(size - len(data))
+            if not chunk:
+                return None
+            data += chunk
+        return bytes(data)
+
+    def _receive(self):
+        """Read messages into the queue until the connection closes."""
+        try:
+            while True:
+                header = self._read(LENGTH.size)
+                message = header and self._read(LENGTH.unpack(header)[0])
+                if message is None:
+                    break
+                self.bytes_received += LENGTH.size + len(message)
+                self.messages.append(message)
+        except OSError:
+            pass
+        self.connected = False
+
+    def update(self):
+        """Apply every message received since the last update."""
+        while self.messages:
+            message = self.messages.popleft()
+            if message[0] == KEYFRAME:
+                self._apply_keyframe(message)
+            elif self.synced:
+                self._apply_delta(message)
+        # Play explosions on at the published game's time.
+        self.game.explosion_store.update()
+
+    def _apply_keyframe(self, message):
+        """Restore the whole game from a keyframe."""
+        _, count = KEYFRAME_HEADER.unpack_from(message)
+        start = KEYFRAME_HEADER.size
+        slots = struct.unpack_from(f'<{count}I', message, start)
+        self.game.restore(message[start + count * SLOT.size:])
+        self.bullets = dict(zip(slots, self.game.bullets.sprites()))
+        self.synced = True
+
+    def _apply_delta(self, message):
+        """Apply the changes in a delta to the game."""
+        game = self.game
+        fleet = game.fleet
+        (_, ticks, time_ms, state, ships_left, ship_x, offset_x, offset_y,
+            moved, killed, culled, spawned, started) = (
+            DELTA_HEADER.unpack_from(message))
+        offset = DELTA_HEADER.size
+
+        game.ticks = ticks
+        game.time_ms = time_ms
+        state = snapshot.STATES[state]
+        if game.state.current != state:
+            game.state.change(state)
+        game.stats.ships_left = ships_left
+        game.ship.rect.x = ship_x
+        game.ship.x = game.ship.prev_x = float(ship_x)
+
+        fleet.offset_x = offset_x
+        fleet.offset_y = offset_y
+        np.add(fleet.base_x, offset_x, out=fleet.x)
+        fleet.prev_x[:] = fleet.x
+        np.add(fleet.base_y, offset_y, out=fleet.y)
+        fleet.stale = True
+        for _ in range(killed):
+            fleet.sprites[KILLED.unpack_from(message, offset)[0]].kill()
+            offset += KILLED.size
+
+        for _ in range(culled):
+            bullet = self.bullets.pop(CULLED.unpack_from(message, offset)[0],
+                None)
+            offset += CULLED.size
+            if bullet:
+                bullet.kill()
+        for bullet in self.bullets.values():
+            bullet.y += moved
+            bullet.prev_y = bullet.y
+            bullet.rect.y = bullet.y
+        for _ in range(spawned):
+            slot, x, y = SPAWNED.unpack_from(message, offset)
+            offset += SPAWNED.size
+            bullet = game.bullet_pool.acquire()
+            if bullet:
+                bullet.rect.x = x
+                bullet.y = bullet.prev_y = y
+                bullet.rect.y = y
+                self.bullets[slot] = bullet
+
+        pools = snapshot.explosion_pools(game)
+        for _ in range(started):
+            kind, x, y, start_time, lifetime = STARTED.unpack_from(message,
+                offset)
+            offset += STARTED.size
+            explosion = pools[kind].acquire()
+            if explosion:
+                explosion.start(0, 0)
+                explosion.rect.topleft = (x, y)
+                explosion.start_time = start_time
+                explosion.lifetime = lifetime
+
+    def bandwidth(self):
+        """Return the bytes per second received so far."""
+        return self.bytes_received / max(perf_counter() - self.started, 1e-9)
+
+    def close(self):
+        """Disconnect from the game."""
+        self.socket.close()
+
+def watch(host, port):
+    """Open a window showing the game served on host and port."""
+    # Imported here, since the game imports this module to serve itself.
+    import pygame
+    from spaceinvader import SpaceInvaders
+
+    ai_game = SpaceInvaders(num_aliens=0)
+    pygame.display.set_caption('Space Invaders - Spectating')
+    client = SpectatorClient(ai_game, host, port)
+    clock = pygame.time.Clock()
+    watching = True
+    while watching and (client.connected or client.messages):
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                watching = False
+        client.update()
+        ai_game._update_screen()
+        clock.tick(ai_game.settings.frame_rate)
+    client.close()
+    print(f"Received {client.bytes_received} bytes, "
+          f"{client.bandwidth():.0f} bytes/s.")
@@ -0,0 +1,91 @@
+import random
+import pygame
+
+class Starfield:
+    """A class to bake the star map into pre-rendered background layers."""
+
+    def __init__(self, ai_game, seed=None):
+        """Initialize the starfield and bake it for the current screen."""
+        self.settings = ai_game.settings
+        self.image = ai_game.assets.get('star')
+
+        # Keep the seed so the same star map can be baked again.
+        if seed is None:
+            seed = random.randrange(2 ** 32)
+        self.seed = seed
+
+        self.bake(ai_game.screen.get_size())
+
+    def bake(self, size):
+        """Render the star map for a screen size. Call again on resize."""
+        self.size = size
+        rng = random.Random(self.seed)
+        self.background = pygame.Surface(size).convert()
+        self.background.fill(self.settings.bg_color)
+
+        # Scrolling layers and their vertical offsets, nearest layer last.
+        self.layers = []
+        self.offsets = []
+        self.speeds = []
+
+        layer_count = self.settings.star_layers
+        if layer_count <= 1:
+            # A single static layer is baked straight into the background.
+            self._draw_stars(self.background, self.image, rng)
+            return
+
+        for layer_number in range(layer_count):
+            depth = (layer_number + 1) / layer_count
+            # Farther layers have smaller stars and scroll more slowly.
+            star_size = max(1, round(self.image.get_width() * depth))
+            image = pygame.transform.smoothscale(
+                self.image, (star_size, star_size))
+            layer = pygame.Surface(size).convert()
+            layer.fill(self.settings.bg_color)
+            self._draw_stars(layer, image, rng, 1 / layer_count)
+            layer.set_colorkey(self.settings.bg_color, pygame.RLEACCEL)
+            self.layers.append(layer)
+            self.offsets.append(0.0)
+            self.speeds.append(self.settings.star_scroll_speed * depth)
+
+    def _draw_stars(self, surface, image, rng, density=1.0):
+        """Draw a jittered grid of stars onto a surface."""
+        width, height = self.size
+        star_width, star_height = self.image.get_size()
+        # Determine the number of stars per row and the number of rows.
+        star_amount_x = (width - star_width) // (2 * star_width)
+        number_rows = (height - 2 * star_height) // (2 * star_height)
+
+        stars = []
+        for star_row_num in range(number_rows):
+            for star_number in range(star_amount_x):
+                x = 2.5 * star_width + 8 * star_width * star_number
+                y = star_height + 8 * star_height * star_row_num
+                # Randomize star locations on screen.
+                x += rng.randint(-15, 15)
+                y += rng.randint(-15, 15)
+                if x < width and y < height and rng.random() < density:
+                    stars.append((image, (x, y)))
+        surface.blits(stars, doreturn=False)
+
+    @property
+    def scrolling(self):
+        """Return True if the starfield changes from frame to frame."""
+        return bool(self.layers)
+
+    def update(self):
+        """Scroll each parallax layer down the screen."""
+        height = self.size[1]
+        for layer_number, speed in enumerate(self.speeds):
+            self.offsets[layer_number] = (
+                self.offsets[layer_number] + speed) % height
+
+    def draw(self, surface):
+        """Draw the background and any scrolling layers to a surface."""
+        surface.blit(self.background, (0, 0))
+        height = self.size[1]
+        for layer, offset in zip(self.layers, self.offsets):
+            # Draw each layer twice so it wraps around the screen.
+            y = int(offset)
+            surface.blit(layer, (0, y))
+            surface.blit(layer, (0, y - height))
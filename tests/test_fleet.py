@@ -0,0 +1,57 @@
+"""
+Check that fleets are built with exactly num_aliens invaders, laid out
+    without overlapping, and respawn within bench_game's budget. Run from
+    the repository root with python -m pytest tests
+"""
+import os
+import sys
+from time import perf_counter
+
+import pytest
+
+# Run headless against the game modules in the repository root.
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'benchmarks'))
+os.chdir(ROOT)
+os.environ['SDL_VIDEODRIVER'] = 'dummy'
+
+from spaceinvader import SpaceInvaders
+from bench_game import RESPAWN_BUDGET_MS, RESPAWN_BUDGET_PER_ALIEN_MS
+
+# Empty, single, one and two rows either side of a full row of nine, the
+# default fleet, one past it and a large fleet.
+ALIEN_COUNTS = [0, 1, 9, 10, 36, 37, 1000]
+
+# Respawns to time, keeping the fastest, so a busy machine does not fail.
+REPEATS = 5
+
+@pytest.mark.parametrize('num_aliens', ALIEN_COUNTS)
+def test_fleet_size(num_aliens):
+    """A fleet has exactly num_aliens invaders, built and respawned."""
+    ai_game = SpaceInvaders(num_aliens=num_aliens, headless=True, seed=0)
+    assert len(ai_game.aliens) == num_aliens
+    ai_game._create_fleet()
+    assert len(ai_game.aliens) == num_aliens
+
+@pytest.mark.parametrize('num_aliens', ALIEN_COUNTS)
+def test_fleet_does_not_overlap(num_aliens):
+    """No two invaders in a new fleet overlap."""
+    ai_game = SpaceInvaders(num_aliens=num_aliens, headless=True, seed=0)
+    rects = [alien.rect for alien in ai_game.aliens]
+    for number, rect in enumerate(rects):
+        assert rect.collidelistall(rects) == [number]
+
+@pytest.mark.parametrize('num_aliens', ALIEN_COUNTS)
+def test_respawn_budget(num_aliens):
+    """Respawning a fleet takes no longer than bench_game allows."""
+    ai_game = SpaceInvaders(num_aliens=num_aliens, headless=True, seed=0)
+    ai_game._create_fleet()
+    times = []
+    for _ in range(REPEATS):
+        start = perf_counter()
+        ai_game._create_fleet()
+        times.append((perf_counter() - start) * 1000)
+    budget = RESPAWN_BUDGET_MS + RESPAWN_BUDGET_PER_ALIEN_MS * num_aliens
+    assert min(times) <= budget, \
+        f'respawn took {min(times):.3f} ms, over the {budget:.3f} ms budget'
@@ -0,0 +1,69 @@
+import threading
+
+import pygame.font
+
+class TextCache:
+    """A class to share fonts and keep rendered text until it changes."""
+
+    def __init__(self, limit=256):
+        """Initialize an empty cache holding at most limit text images."""
+        self.limit = limit
+        # Fonts by size, and rendered images by text, size and colors.
+        self.fonts = {}
+        self.images = {}
+        # The first font is found on a background thread, since looking
+        # up system fonts is slow. Text is left blank until it is ready.
+        self.loader = None
+        self.renders = 0
+        self.hits = 0
+
+    def _load_font(self, size):
+        """Start the font module and load the first font."""
+        pygame.font.init()
+        self.fonts[size] = pygame.font.SysFont(None, size)
+
+    def font(self, size):
+        """Return the font for a size, or None while fonts are loading."""
+        font = self.fonts.get(size)
+        if font:
+            return font
+        if self.loader is None:
+            self.loader = threading.Thread(target=self._load_font,
+                args=(size,), daemon=True)
+            self.loader.start()
+            return None
+        if self.loader.is_alive():
+            return None
+        # Once the system fonts are known, other sizes load quickly.
+        font = self.fonts[size] = pygame.font.SysFont(None, size)
+        return font
+
+    def render(self, text, size, color, background=None):
+        """
+        Return text rendered at a font size, only rendering it the first
+            time it is asked for. Returns None while fonts are loading.
+        """
+        key = (text, size, color, background)
+        image = self.images.get(key)
+        if image:
+            self.hits += 1
+            return image
+        font = self.font(size)
+        if not font:
+            return None
+        image = font.render(text, True, color, background)
+        # Forget the oldest text once the cache is full.
+        if len(self.images) >= self.limit:
+            del self.images[next(iter(self.images))]
+        self.images[key] = image
+        self.renders += 1
+        return image
+
+    def stats(self):
+        """Return how often rendered text was reused."""
+        return {
+            'fonts': len(self.fonts),
+            'images': len(self.images),
+            'renders': self.renders,
+            'hits': self.hits,
+        }
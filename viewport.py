@@ -0,0 +1,224 @@
+"""
+Show the game, which is always played at the screen size in settings, in a
+    window of any size or fullscreen. There are two ways to draw a scaled
+    frame, and benchmarks/bench_scaling.py times both:
+
+    - Draw images scaled once for each window scale straight to the window.
+      This is two to three times faster for the default fleet.
+    - Draw the frame at the screen size and scale all of it to the window.
+      This costs about the same whatever is on screen, so it is faster once
+      enough invaders and explosions are drawn.
+
+Where the two cross depends on the window size, what is on screen and the
+    machine, so the viewport times both at each scale, uses the faster one
+    and now and then times the other again.
+"""
+from time import perf_counter
+
+import pygame
+
+class Viewport:
+    """A class to draw the game scaled to fit the window."""
+
+    # Frames between timing the slower way of drawing again, in case it
+    # has become the faster one.
+    RETIME_FRAMES = 60
+
+    # Scales to keep pre-scaled images for, so switching between a window
+    # and fullscreen does not scale everything again.
+    SCALES_KEPT = 2
+
+    def __init__(self, ai_game):
+        """Initialize the viewport and open the window."""
+        self.game = ai_game
+        self.settings = ai_game.settings
+        self.size = (self.settings.screen_width, self.settings.screen_height)
+        self.fullscreen = self.settings.fullscreen
+        self.window_size = tuple(self.settings.window_size or self.size)
+        # True or False to always or never draw from pre-scaled images, or
+        # None to use whichever is faster.
+        self.prescale = None
+
+        # Scaled images for the most recent scales, by original image.
+        self.caches = {}
+        self.open()
+
+    def open(self):
+        """Open the window, or go fullscreen, and fit the game to it."""
+        if self.fullscreen:
+            self.window = pygame.display.set_mode((0, 0), pygame.FULLSCREEN)
+        else:
+            self.window = pygame.display.set_mode(self.window_size,
+                pygame.RESIZABLE)
+        self.resize(self.window.get_size())
+
+    def resize(self, size):
+        """Fit the game to a window size, with black bars around it."""
+        width, height = self.size
+        self.scale = min(size[0] / width, size[1] / height)
+        scaled_size = (round(width * self.scale), round(height * self.scale))
+        self.area = pygame.Rect(((size[0] - scaled_size[0]) // 2,
+            (size[1] - scaled_size[1]) // 2), scaled_size)
+        # The part of the window whole frames are scaled into.
+        self.frame = self.window.subsurface(self.area)
+        # Recent seconds to draw a frame each way at this scale, by whether
+        # it was drawn from pre-scaled images.
+        self.times = {True: None, False: None}
+        self.frames = 0
+        self._use_scale()
+        self.window.fill((0, 0, 0))
+
+    def _use_scale(self):
+        """Switch to the current scale's images, forgetting the oldest."""
+        self.images = self.caches.pop(self.scale, None) or {}
+        self.caches[self.scale] = self.images
+        while len(self.caches) > self.SCALES_KEPT:
+            del self.caches[next(iter(self.caches))]
+
+    def clear(self):
+        """Forget every scaled image, after the originals are replaced."""
+        self.caches = {}
+        self._use_scale()
+
+    def window_resized(self, size):
+        """Refit the game after the player resizes the window."""
+        if self.fullscreen:
+            return
+        self.window_size = size
+        self.window = pygame.display.get_surface()
+        self.resize(self.window.get_size())
+
+    def toggle_fullscreen(self):
+        """Switch between fullscreen and the window."""
+        self.fullscreen = not self.fullscreen
+        self.open()
+
+    def image(self, surface):
+        """Return an image scaled to the current scale, scaling it once."""
+        scaled = self.images.get(surface)
+        if scaled is None:
+            width, height = surface.get_size()
+            size = (max(1, round(width * self.scale)),
+                    max(1, round(height * self.scale)))
+            # Smooth scaling would blend colorkeyed edges into the key.
+            if (surface.get_colorkey() is None and
+                    surface.get_bitsize() >= 24):
+                scaled = pygame.transform.smoothscale(surface, size)
+            else:
+                scaled = pygame.transform.scale(surface, size)
+                if surface.get_colorkey() is not None:
+                    scaled.set_colorkey(surface.get_colorkey(),
+                        pygame.RLEACCEL)
+            self.images[surface] = scaled
+        return scaled
+
+    def rect(self, rect):
+        """
+        Return where a rect on the screen is drawn in the window. Edges are
+            scaled separately so touching rects still touch.
+        """
+        scale = self.scale
+        left = round(rect.x * scale)
+        top = round(rect.y * scale)
+        return pygame.Rect(left + self.area.x, top + self.area.y,
+            round(rect.right * scale) - left,
+            round(rect.bottom * scale) - top)
+
+    def to_screen(self, position):
+        """
+        Return the screen position under a window position, or None if it
+            is in the bars around the game.
+        """
+        if not self.area.collidepoint(position):
+            return None
+        return (int((position[0] - self.area.x) / self.scale),
+                int((position[1] - self.area.y) / self.scale))
+
+    def prescaling(self):
+        """Return True if this frame is drawn from pre-scaled images."""
+        if self.prescale is not None:
+            return self.prescale
+        times = self.times
+        # Time each way once at a new scale.
+        for prescaling in (True, False):
+            if times[prescaling] is None:
+                return prescaling
+        faster = times[True] <= times[False]
+        if self.frames % self.RETIME_FRAMES == 0:
+            return not faster
+        return faster
+
+    def draw(self):
+        """Draw every object scaled to the window and flip it."""
+        game = self.game
+        prescaling = self.prescaling()
+        images = len(self.images)
+        start = perf_counter()
+        if prescaling:
+            self._draw_prescaled()
+        else:
+            game._draw_objects()
+            pygame.transform.scale(game.screen, self.area.size, self.frame)
+        seconds = perf_counter() - start
+        # Frames that scaled new images are slower than the rest, so they
+        # are not timed.
+        if len(self.images) == images:
+            last = self.times[prescaling]
+            self.times[prescaling] = (seconds if last is None else
+                                      (last + seconds) / 2)
+        self.frames += 1
+
+        # Text is rendered at the window's scale rather than scaled.
+        if game.state.waiting:
+            game.play_button.draw_button(self.window,
+                self.rect(game.play_button.rect), self.scale)
+        # The overlay goes inside the game's area, which is redrawn every
+        # frame, so old text never lingers in the bars.
+        if game.profiler and game.profiler.show_overlay:
+            game.profiler.draw_overlay(self.frame)
+        game._present()
+
+    def _draw_prescaled(self):
+        """Draw the starfield and every object from pre-scaled images."""
+        game = self.game
+        window = self.window
+        image = self.image
+        rect = self.rect
+        area = self.area
+        scale = self.scale
+
+        # Keep the game inside its area, leaving the bars black.
+        window.set_clip(area)
+        starfield = game.starfield
+        window.blit(image(starfield.background), area)
+        height = round(starfield.size[1] * scale)
+        for layer, offset in zip(starfield.layers, starfield.offsets):
+            # Draw each layer twice so it wraps around the screen.
+            y = area.y + round(int(offset) * scale)
+            layer = image(layer)
+            window.blit(layer, (area.x, y))
+            window.blit(layer, (area.x, y - height))
+
+        window.blit(image(game.ship.image), rect(game.ship.rect))
+        for bullet in game.bullets.sprites():
+            window.fill(bullet.color, rect(bullet.rect))
+        # Images are only placed, so only their top left corners are scaled.
+        left, top = area.topleft
+        for group in (game.aliens, game.explosions):
+            window.blits([(image(sprite.image),
+                (round(sprite.rect.x * scale) + left,
+                 round(sprite.rect.y * scale) + top))
+                for sprite in group.sprites()], doreturn=False)
+        window.set_clip(None)
+
+    def stats(self):
+        """Return the window size, scale and how many images are cached."""
+        return {
+            'window': self.window.get_size(),
+            'scale': self.scale,
+            'prescaling': self.prescaling(),
+            'prescaled_ms': self.times[True] and self.times[True] * 1000,
+            'scaled_ms': self.times[False] and self.times[False] * 1000,
+            'scales_cached': len(self.caches),
+            'images_cached': sum(map(len, self.caches.values())),
+        }